@@ -1,19 +1,41 @@
+import asyncio
 import os
 from contextlib import asynccontextmanager
-from multiprocessing import Process
 
 import uvicorn
 import socketio
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
-from backtest_env.base.strategy import Strategy
-from backtest_env.constants import DATA_DIR
+from backtest_env.constants import DATA_DIR, MAX_CONCURRENT_BACKTESTS, WORKER_MAX_JOBS
+from backtest_env.dto import SweepRequest
+from backtest_env.price_store import PriceHandle, SharedPriceStore
+from backtest_env.scheduler import JobScheduler
 from backtest_env.strategies import STRATEGIES
+from backtest_env.sweep import run_sweep
 from backtest_env.utils import extract_metadata_in_batch
+from backtest_env.worker_pool import WorkerPool
 from backtest_env.logger import logger
 
-processes: dict[str, Process] = {}
+# seconds between two checks of the worker pool for finished jobs & exited workers
+POLL_INTERVAL = 0.1
+
+# candles are loaded once per (symbol, timeframe) and shared by all backtest processes
+shared_prices = SharedPriceStore()
+price_handles: dict[str, PriceHandle] = {}
+# sids of the connected clients
+clients: set[str] = set()
+
+
+def release_prices(sid: str):
+    if sid in price_handles:
+        shared_prices.release(price_handles.pop(sid))
+
+
+# backtests run in pre-forked workers, the job id of a backtest is the sid of its client
+worker_pool = WorkerPool(MAX_CONCURRENT_BACKTESTS, WORKER_MAX_JOBS)
+# requests above the concurrency limit wait in the scheduler's queue
+scheduler = JobScheduler(worker_pool, MAX_CONCURRENT_BACKTESTS, on_finished=release_prices)
 
 origins = [
     "http://localhost:5173",  # FE
@@ -25,10 +47,21 @@ origins = [
 async def lifespan(application: FastAPI):
     # start server routines
     os.makedirs(DATA_DIR, exist_ok=True)
+    worker_pool.start()
+    poll_task = asyncio.create_task(poll_workers())
     yield
     # stop server routines
-    for process in processes.values():
-        process.join()
+    poll_task.cancel()
+    worker_pool.close()
+    shared_prices.close()
+
+
+async def poll_workers():
+    while True:
+        scheduler.poll()
+        for sid, position in scheduler.get_position_updates().items():
+            await sio.emit("queue_position", {"position": position}, to=sid)
+        await asyncio.sleep(POLL_INTERVAL)
 
 
 app = FastAPI(lifespan=lifespan)
@@ -58,41 +91,75 @@ def get_strategies():
 
 @app.get("/files/metadata")
 async def get_files_metadata():
-    return await extract_metadata_in_batch(os.listdir(DATA_DIR))
+    # data dir also contains the .npy caches of the csv files, skip them
+    filenames = [name for name in os.listdir(DATA_DIR) if name.endswith(".csv")]
+    return await extract_metadata_in_batch(filenames)
+
+
+@app.get("/backtests/status")
+def get_backtests_status():
+    return scheduler.status()
+
+
+@app.post("/sweeps")
+async def sweep(request: SweepRequest):
+    # a sweep runs its backtests on its own process pool, one process per slot it takes from the
+    # scheduler, so backtests & sweeps together stay under MAX_CONCURRENT_BACKTESTS
+    slots = scheduler.reserve_free_slots()
+    if slots == 0:
+        raise HTTPException(status_code=503, detail="All backtest slots are busy, retry later")
+    try:
+        # wait for the pool in a thread to keep the event loop free
+        return await asyncio.to_thread(run_sweep, **request.model_dump(), max_workers=slots)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    finally:
+        scheduler.release_slots(slots)
 
 # sio.event and sio.on('event_name') are equivalent
 @sio.event
 def connect(sid, environ, auth):
     logger.info(f"Client: {sid} connected")
+    clients.add(sid)
 
 
 @sio.event
 def disconnect(sid, reason):
     logger.info(f"Client: {sid} disconnected, reason: {reason}")
-    if sid in processes:
-        processes[sid].terminate()
-        del processes[sid]
-        logger.info(f"Stopped backtest process of Client: {sid}")
+    clients.discard(sid)
+    stop_backtest(sid)
 
 
 @sio.on("backtest")
-def backtest(sid, data: dict):
-    logger.info(f"Start backtest process {sid} with params: {data}")
-    backtest_process = Process(target=start, args=(data,))
-    backtest_process.start()
-
-    processes[sid] = backtest_process
+async def backtest(sid, data: dict):
+    logger.info(f"Start backtest of Client {sid} with params: {data}")
+    # a client runs one backtest at a time
+    stop_backtest(sid)
+    # converting a csv for the first time takes a while, don't block the event loop
+    handle = await asyncio.to_thread(shared_prices.acquire, data["symbol"], data["timeframe"])
+    if sid not in clients:
+        # disconnected while the prices were loading, there's no backtest to cancel yet
+        shared_prices.release(handle)
+        return
+    # another backtest of the client may have been submitted while the prices were loading
+    stop_backtest(sid)
+    price_handles[sid] = handle
+    scheduler.submit(sid, data, handle, priority=data.get("priority", 0))
+
+
+def stop_backtest(sid: str):
+    if scheduler.cancel(sid):
+        logger.info(f"Stopped backtest of Client: {sid}")
+    release_prices(sid)
 
 
 @sio.on("*")
 async def generic_event_handler(event, sid, data):
+    # data is relayed as is, binary frames (bytes) are sent as socket.io binary attachments.
+    # Events sent with a callback are acked when this returns, the emitter of a backtest waits for
+    # these acks (see FrameEmitter)
     await sio.emit(event, data, skip_sid=sid)
 
 
-def start(args: dict):
-    strategy: Strategy = STRATEGIES[args["strategy"]].from_cfg(args)
-    strategy.run(args["allowLiveUpdates"])
-
-
 if __name__ == "__main__":
     uvicorn.run(socketio_app, host="0.0.0.0", port=8000)
@@ -1,36 +1,79 @@
 from time import time_ns
 from socketio import Client
 
+
+def now() -> int:
+    # Use time_ns() to avoid the precision loss caused by the float type.
+    # divide by 1 million to get millisecond
+    # use floor division to avoid the risk of being in the future
+    return time_ns() // 1_000_000
+
+
 class Event:
-    def __init__(self, data: any):
+    __slots__ = ("data", "timestamp")
+
+    def __init__(self, data: any, timestamp: int = 0):
         self.data = data
-        # Use time_ns() to avoid the precision loss caused by the float type.
-        # divide by 1 million to get millisecond
-        # use floor division to avoid the risk of being in the future
-        self.timestamp = time_ns() // 1_000_000
+        # reading the clock isn't free, timestamp is 0 unless a subscriber of the event asks for it
+        self.timestamp = timestamp
+
+
+class Channel:
+    """
+    Handlers of a single event. They're stored as a tuple of (handler, raw, timestamp) which is
+    rebuilt on (un)subscribe, so publishing never copies or filters anything.
+    raw handlers receive the published data directly, the others receive an Event that is created
+    once per publish and shared by all of them
+    """
+
+    def __init__(self):
+        self.handlers: tuple[tuple[callable, bool, bool], ...] = ()
+        self.timestamped = False
+
+    def add(self, handler: callable, raw: bool = False, timestamp: bool = False):
+        self.handlers = self.handlers + ((handler, raw, timestamp),)
+        self.timestamped = self.timestamped or timestamp
+
+    def remove(self, handler: callable):
+        self.handlers = tuple(h for h in self.handlers if h[0] != handler)
+        self.timestamped = any(timestamp for _, _, timestamp in self.handlers)
+
+    def publish(self, data: any):
+        event = None
+        for fn, raw, _ in self.handlers:
+            if raw:
+                fn(data)
+                continue
+            if event is None:
+                event = Event(data, now() if self.timestamped else 0)
+            fn(event)
+
 
 class EventBus:
     def __init__(self):
-        self.handlers: dict[str, list[callable]] = {}
+        self.channels: dict[str, Channel] = {}
 
-    def subscribe(self, event_name: str, handler: callable):
-        # use setdefault instead of get() so we don't have to reassign handlers like this:
-        # self.handlers = handlers 
-        handlers = self.handlers.setdefault(event_name, [])
-        handlers.append(handler)
+    def channel(self, event_name: str) -> Channel:
+        # hot paths can keep the channel and call channel.publish() to skip the lookup by name
+        return self.channels.setdefault(event_name, Channel())
+
+    def subscribe(
+        self, event_name: str, handler: callable, raw: bool = False, timestamp: bool = False
+    ):
+        self.channel(event_name).add(handler, raw, timestamp)
         return event_name, handler
-    
+
     def unsubcribe(self, subscription: tuple[str, callable]):
         event_name, handler = subscription
-        handlers = self.handlers.setdefault(event_name, [])
-        # setdefault does not work as we intended (update self.handlers[event_name]) 
-        # if we do something like: handlers = [h for h in handlers if h != handler]
-        self.handlers[event_name] = [h for h in handlers if h != handler]
+        if event_name in self.channels:
+            self.channels[event_name].remove(handler)
 
     def publish(self, event_name: str, data: any):
-        handlers = self.handlers.get(event_name, [])
-        for fn in handlers:
-            fn(Event(data))
+        channel = self.channels.get(event_name)
+        # nobody listens to this event
+        if channel is None:
+            return
+        channel.publish(data)
 
 
 event_bus = EventBus()
@@ -42,9 +85,11 @@ class EventHub:
     socketio_event will be handled by Front-end
     """
 
-    def __init__(self, sio: Client = None):
+    def __init__(self, sio: Client = None, bus: EventBus = None):
         self.sio = sio
-        self.event_bus = event_bus
+        # components of a backtest share their own bus so backtests in the same process don't see
+        # each other's events, the global bus is used if none is given
+        self.event_bus = bus if bus is not None else event_bus
         self.subscriptions = []
 
     def emit_to_frontend(self, event, data):
@@ -53,8 +98,10 @@ class EventHub:
     def emit(self, event, data):
         self.event_bus.publish(event, data)
 
-    def subscribe(self, event_name: str, handler: callable):
-        self.subscriptions.append(self.event_bus.subscribe(event_name, handler))
+    def subscribe(
+        self, event_name: str, handler: callable, raw: bool = False, timestamp: bool = False
+    ):
+        self.subscriptions.append(self.event_bus.subscribe(event_name, handler, raw, timestamp))
 
     def unsubscribe(self):
         for subscrition in self.subscriptions:
@@ -0,0 +1,74 @@
+from abc import abstractmethod
+
+import numpy as np
+
+from backtest_env.base.side import OrderSide
+from backtest_env.base.strategy import Strategy
+from backtest_env.dto import Args
+from backtest_env.orders.market import MarketOrder
+from backtest_env.vectorized import Signals, get_exits, get_sizes, run_signals
+
+
+class SignalStrategy(Strategy):
+    """
+    Strategies whose entries & exits only depend on the candles, so they can be computed for all
+    candles at once by get_signals(). They run on the event loop like other strategies, or on the
+    vectorized engine (vectorized.py) with Args.vectorized, both give the same result.
+    At each candle: pending market orders are filled, positions are closed if there's an exit,
+    then market orders of the entries are placed, they're filled at the next candle
+    """
+
+    def __init__(self, args: Args):
+        super().__init__(args)
+        self.vectorized = args.vectorized and not args.allowLiveUpdates
+        n = len(self.data.prices)
+        signals = self.get_signals(self.data.prices)
+        self.signals = Signals(
+            get_sizes(signals.long_entries, n),
+            get_sizes(signals.short_entries, n),
+            get_exits(signals.exits, n),
+        )
+        # python lists are faster to index in the event loop
+        self.long_sizes = self.signals.long_entries.tolist()
+        self.short_sizes = self.signals.short_entries.tolist()
+        self.exits = self.signals.exits.tolist()
+        # result of the vectorized engine
+        self.result: dict | None = None
+
+    @abstractmethod
+    def get_signals(self, prices: np.ndarray) -> Signals:
+        # signals of a candle must only use that candle and the previous ones
+        pass
+
+    def run(self, allow_live_update: bool = False):
+        if not self.vectorized:
+            return super().run(allow_live_update)
+        self.result = run_signals(
+            self.data.prices, self.signals, self.position_manager.balance.initial
+        )
+        if self.equity is not None:
+            self.equity = self.result["equity"].tolist()
+
+    def get_result(self) -> dict:
+        if self.result is None:
+            return super().get_result()
+        keys = ["pnl", "balance", "fills", "candles"]
+        if self.equity is not None:
+            keys.append("maxDrawdown")
+        return {key: self.result[key] for key in keys}
+
+    def update(self):
+        self.order_manager.process_orders()
+        i = self.data.idx
+        if self.exits[i]:
+            self.order_manager.close_all_positions(self.data.get_current_price())
+        for side, sizes in ((OrderSide.BUY, self.long_sizes), (OrderSide.SELL, self.short_sizes)):
+            if sizes[i] > 0:
+                order = MarketOrder(
+                    side,
+                    sizes[i],
+                    self.symbol,
+                    self.data.get_close_price(),
+                    created_at=self.data.get_close_time(),
+                )
+                self.order_manager.add_order(order)
@@ -1,15 +1,21 @@
-import time
+import threading
 from typing import TypeVar, Type
 from abc import ABC, abstractmethod
 
+import numpy as np
 from socketio import Client
 
-from backtest_env.constants import SOCKETIO_URL
+from backtest_env.base.event_hub import EventBus
+from backtest_env.constants import FRONTEND_MAX_FPS, SOCKETIO_URL
 from backtest_env.dto import Args
+from backtest_env.emitter import FrameEmitter
+from backtest_env.fast_forward import WakeUp, find_next_candle
+from backtest_env.matching_engine import VectorizedMatchingEngine
 from backtest_env.order_manager import OrderManager
 from backtest_env.position_manager import PositionManager
 from backtest_env.price import PriceDataSet
 from backtest_env.logger import logger
+from backtest_env.utils import get_max_drawdown
 
 T = TypeVar("T", bound="Strategy")
 
@@ -18,14 +24,31 @@ class Strategy(ABC):
     # base class for all strategies
     def __init__(self, args: Args):
         self.symbol = args.symbol
+        # account value after each candle, None when recording is off
+        self.equity: list[float] | None = [] if args.recordEquity else None
+        # skip candles when the strategy is idle and no order can be filled, see skip_idle_candles()
+        self.fast_forward = args.fastForward and not args.allowLiveUpdates
         self.socketio: Client = None
+        # components emit to front-end through the emitter, so they never block on the socket
+        self.emitter: FrameEmitter = None
+        # number of candles processed per `next` request of the front-end
+        self.steps_per_request = args.stepsPerRequest
+        # set when live mode is over: all candles are consumed or the front-end disconnected
+        self.finished = threading.Event()
         self.init_socketio(args)
+        # every backtest has its own bus, so many backtests can run in the same process
+        self.event_bus = EventBus()
         self.data = PriceDataSet(
-            args.symbol, args.timeframe, args.startTime, args.endTime, self.socketio
+            args.symbol, args.timeframe, args.startTime, args.endTime, self.emitter, self.event_bus
         )
-        self.position_manager = PositionManager(args.initialBalance, self.socketio)
+        self.position_manager = PositionManager(args.initialBalance, self.emitter, self.event_bus)
         self.order_manager = OrderManager(
-            self.position_manager, self.data, self.socketio, args.symbol
+            self.position_manager,
+            self.data,
+            self.emitter,
+            args.symbol,
+            VectorizedMatchingEngine() if args.vectorizedMatching else None,
+            self.event_bus,
         )
 
     def init_socketio(self, args: Args):
@@ -34,6 +57,8 @@ class Strategy(ABC):
         self.socketio = Client()
         self.socketio.connect(SOCKETIO_URL)
         self.socketio.on("next", self.next)
+        self.socketio.on("disconnect", self.on_disconnect)
+        self.emitter = FrameEmitter(self.socketio, FRONTEND_MAX_FPS, binary=args.binaryFrames)
 
     def run(self, allow_live_update: bool = False):
         # main event loop: getting new candle stick and then process data based on update() logic
@@ -42,24 +67,38 @@ class Strategy(ABC):
             self.run_with_live_updates()
         else:
             while self.data.step():
-                self.update() if self.data.next() else self.cleanup()
+                self.update() if self.data.has_next() else self.cleanup()
+                self.order_manager.flush_fills()
+                if self.equity is not None:
+                    self.record_equity()
+                if self.fast_forward:
+                    self.skip_idle_candles()
 
     def run_with_live_updates(self):
         # manually emit the first `ready` event using data.step() because FE needs BE to go first
-        self.socketio.emit("ready", {})
-        # waits for all data to be consumed by `render_finished` event
-        while self.data.next():
-            time.sleep(1)
+        self.emitter.emit("ready", {})
+        # next() runs on socketio's threads, we wake up as soon as the socket is disconnected:
+        # by cleanup() after the last candle or by the front-end
+        self.finished.wait()
 
     def next(self, data):
         # <data> is unused because next() is an event handler, that parameter is required
-        self.data.step()
-        if self.data.next():
+        if self.finished.is_set():
+            return
+        for _ in range(self.steps_per_request):
+            self.data.step()
+            if not self.data.has_next():
+                self.cleanup()
+                return
             self.update()
-            self.position_manager.emit_pnl(self.data.get_close_price())
-            self.socketio.emit("ready", {})
-        else:
-            self.cleanup()
+            self.order_manager.flush_fills()
+        self.position_manager.emit_pnl(self.data.get_close_price())
+        # buffered events are sent before `ready`
+        self.emitter.emit("ready", {})
+
+    def on_disconnect(self, *args):
+        # python-socketio passes the disconnect reason in recent versions
+        self.finished.set()
 
     @abstractmethod
     def update(self):
@@ -71,15 +110,60 @@ class Strategy(ABC):
     def cleanup(self):
         self.order_manager.cancel_all_orders()
         self.order_manager.close_all_positions(self.data.get_current_price())
+        self.order_manager.flush_fills()
         self.report()
         self.close_socketio()
 
     def report(self):
         logger.info(f"Backtest finished, pnl: {self.position_manager.get_pnl(0.0)}")
 
+    def get_wake_up(self) -> WakeUp | None:
+        # called after update(), return when the strategy needs to be updated again if nothing
+        # is filled in the meantime. None (default) means every candle must be updated
+        return None
+
+    def on_skip(self, candles: np.ndarray):
+        # called with the candles skipped by fast-forward, update aggregated state (running
+        # high/low,...) from them here
+        pass
+
+    def skip_idle_candles(self):
+        wake_up = self.get_wake_up()
+        trigger_prices = self.order_manager.get_trigger_prices()
+        if wake_up is None or trigger_prices is None:
+            return
+        start = self.data.idx + 1
+        # the last candle is never skipped, it runs cleanup()
+        target = min(
+            find_next_candle(self.data.prices, start, trigger_prices, wake_up), len(self.data) - 1
+        )
+        if target <= start:
+            return
+        skipped = self.data.prices[start:target]
+        self.on_skip(skipped)
+        if self.equity is not None:
+            self.equity.extend(self.position_manager.get_equity_curve(skipped[:, 4]).tolist())
+        self.data.skip_to(target)
+
+    def record_equity(self):
+        self.equity.append(self.position_manager.get_equity(self.data.get_close_price()))
+
+    def get_result(self) -> dict:
+        # summary of a finished backtest, all positions are closed by cleanup()
+        result = {
+            "pnl": self.position_manager.get_pnl(0.0),
+            "balance": self.position_manager.balance.current,
+            "fills": len(self.order_manager.filled_orders),
+            "candles": len(self.data.prices),
+        }
+        if self.equity is not None:
+            result["maxDrawdown"] = get_max_drawdown(np.array(self.equity))
+        return result
+
     def close_socketio(self):
         if not self.socketio:
             return
+        self.emitter.close()
         self.socketio.emit(
             "pnl", self.position_manager.get_pnl(0.0), callback=self.socketio.disconnect
         )
@@ -91,6 +175,18 @@ class Strategy(ABC):
         args = Args(**kwargs)
         return cls(args)
 
+    @classmethod
+    def get_episode_length(cls: Type[T], kwargs: dict) -> int:
+        # strategies that cancel all orders & close all positions at every candle whose open time is
+        # a multiple of the episode length (ms) can be backtested in parallel chunks (episodes.py)
+        # 0 means the strategy has no episodes
+        return 0
+
+    @classmethod
+    def get_warmup_length(cls: Type[T], kwargs: dict) -> int:
+        # ms of candles the strategy needs before an episode to rebuild its state (indicators,...)
+        return 0
+
     @classmethod
     def get_required_params(cls: Type[T]) -> dict:
         # similar to from_cfg(), subclass might have other required params, and they can specify them here
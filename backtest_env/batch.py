@@ -0,0 +1,112 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator
+
+from backtest_env import feature_store, price_store
+from backtest_env.constants import DATA_DIR
+from backtest_env.logger import logger
+from backtest_env.price_store import PriceHandle, SharedPriceStore
+from backtest_env.strategies import STRATEGIES
+
+# Headless backtests: no socket.io server/client, configs run in parallel on all cores.
+# Usage: python -m backtest_env.batch configs.jsonl [-o results.jsonl] [-j 8]
+# Each line of the input is an Args/TrendFollowerArgs dict, each line of the output is the
+# result of one config: {"index": line number, "config": ..., "pnl": ..., ...} or
+# {"index": ..., "config": ..., "error": ...} when the backtest fails
+
+# processes aren't forked from the caller, the server calls run_batch() from a thread of its event
+# loop and forking a multi-threaded process may copy locks held by its other threads
+PRELOAD_MODULES = ["backtest_env.batch"]
+
+
+def init_worker(handles: list[PriceHandle]):
+    # one backtest logs a few lines, thousands of them flood the output
+    logger.setLevel(logging.WARNING)
+    for handle in handles:
+        price_store.attach(handle)
+    if handles:
+        # features are saved next to the price data of the batch
+        feature_store.configure(os.path.join(os.path.dirname(handles[0].path), "features"))
+
+
+def run_config(index: int, config: dict, with_equity: bool = False) -> dict:
+    started_at = time.perf_counter()
+    try:
+        run_args = {**config, "allowLiveUpdates": False}
+        if with_equity:
+            run_args["recordEquity"] = True
+        strategy = STRATEGIES[config["strategy"]].from_cfg(run_args)
+        strategy.run()
+        result = strategy.get_result()
+        if with_equity:
+            result["equity"] = strategy.equity
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    return {"index": index, "config": config, **result, "seconds": time.perf_counter() - started_at}
+
+
+def run_batch(
+    configs: list[dict],
+    max_workers: int | None = None,
+    data_dir: str = DATA_DIR,
+    with_equity: bool = False,
+) -> Iterator[dict]:
+    # yield results in completion order, use "index" to match them with their config
+    # with_equity adds the equity curve (account value after each candle) to the results
+    store = SharedPriceStore(data_dir)
+    handles = {}
+    for config in configs:
+        key = (config.get("symbol"), config.get("timeframe"))
+        if key not in handles:
+            try:
+                handles[key] = store.acquire(*key)
+            except Exception as e:
+                # every config of this (symbol, timeframe) will report the error
+                logger.warning(f"Can't load prices of {key}: {e}")
+                handles[key] = None
+    loaded = [handle for handle in handles.values() if handle]
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(PRELOAD_MODULES)
+    with ProcessPoolExecutor(
+        max_workers, mp_context=context, initializer=init_worker, initargs=(loaded,)
+    ) as executor:
+        futures = [
+            executor.submit(run_config, i, config, with_equity) for i, config in enumerate(configs)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+    store.close()
+
+
+def read_configs(file_name: str) -> list[dict]:
+    with open(file_name, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Run backtests without the web stack")
+    parser.add_argument("configs", help="JSON lines file, one Args/TrendFollowerArgs per line")
+    parser.add_argument("-o", "--output", help="JSON lines file of results, stdout by default")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args(argv)
+
+    configs = read_configs(args.configs)
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for result in run_batch(configs, args.workers, args.data_dir):
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,5 +9,12 @@ with open(CONFIG_PATH, "r") as f:
     config: dict[str, Any] = json.load(f)
 
 DATA_DIR = os.path.join(BASE_DIR, "..", "data")
+# indicator columns shared by backtests, see feature_store.py
+FEATURE_DIR = os.path.join(DATA_DIR, "features")
 SOCKETIO_URL = str(config["socketio_url"])
 ORDER_SIZE = int(config["order_size"])
+FRONTEND_MAX_FPS = int(config["frontend_max_fps"])
+# 0 means one backtest per CPU
+MAX_CONCURRENT_BACKTESTS = int(config["max_concurrent_backtests"]) or os.cpu_count()
+WORKER_MAX_JOBS = int(config["worker_max_jobs"])
+FEATURE_CACHE_BYTES = int(config["feature_cache_mb"]) * 1024 * 1024
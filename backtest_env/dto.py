@@ -1,16 +1,31 @@
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class Args(BaseModel):
     initialBalance: float
     symbol: str
     timeframe: str
-    startTime: str  # YYYY-mm-dd format
-    endTime: Optional[str]  # YYYY-mm-dd format
+    startTime: str  # YYYY-mm-dd or YYYY-mm-dd HH:MM format
+    endTime: Optional[str]  # same format, the candle opened at endTime is included
     strategy: str
     allowLiveUpdates: bool  # decide whether front-end can monitor the backtest progress
+    # match pending orders with numpy arrays, faster when thousands of orders are resting
+    vectorizedMatching: bool = False
+    # send candles, orders & fills to front-end as packed binary columns (see wire.py)
+    binaryFrames: bool = False
+    # candles processed per `next` request in live mode, saves a network round trip per candle.
+    # 0 would answer every request with `ready` without moving forward
+    stepsPerRequest: int = Field(1, ge=1)
+    # queued backtests with a higher priority start first
+    priority: int = 0
+    # record the account value after each candle, used for drawdown & equity curves
+    recordEquity: bool = False
+    # jump over candles that can't fill an order nor wake the strategy up, headless runs only
+    fastForward: bool = False
+    # run signal strategies (base/signal_strategy.py) on the vectorized engine, headless runs only
+    vectorized: bool = False
 
 
 class TrendFollowerArgs(Args):
@@ -18,3 +33,13 @@ class TrendFollowerArgs(Args):
     orderSize: float
     interval: int
     candleCacheSize: int
+
+
+class SweepRequest(BaseModel):
+    # see backtest_env.sweep.run_sweep()
+    config: dict
+    space: dict
+    method: str = "grid"
+    samples: int = 100
+    seed: int = 0
+    halving: Optional[dict] = None
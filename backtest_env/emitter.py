@@ -0,0 +1,131 @@
+import threading
+import time
+
+from socketio import Client
+
+from backtest_env.logger import logger
+from backtest_env.wire import STREAM_ENCODERS
+
+# only the latest value of these events matters, older values are dropped
+STATE_EVENTS = {"positions", "pnl"}
+# append-only events, every item is sent but many items are packed into one frame
+STREAM_EVENTS = {"new_candle", "new_orders", "fills"}
+# seconds to wait for the ack of a frame, after that the frame is considered lost (disconnected)
+ACK_TIMEOUT = 5.0
+
+
+class FrameEmitter:
+    """
+    Sits between the backtest and the socket, so the simulation doesn't wait for the front-end.
+    State & stream events are buffered and sent by a background thread as a single "frame" event,
+    at most <max_fps> frames per second:
+        {"new_candle": [...], "new_orders": [...], "fills": [...], "positions": ..., "pnl": ...}
+    Other events (ready, current_orders,...) are sent right away, after the buffered ones so the
+    front-end receives events in order.
+    Frames are sent with an ack callback and at most <max_in_flight> frames wait for their ack
+    (app.py acks a frame once it has relayed it). When acks are late, the sender waits, the
+    buffers fill up and once more than <max_buffer> stream items are waiting, emit() blocks until
+    the sender catches up (backpressure)
+    With binary=True, stream items are packed by backtest_env.wire on the sender thread
+    """
+
+    def __init__(
+        self,
+        sio: Client,
+        max_fps: int = 30,
+        max_buffer: int = 10_000,
+        binary: bool = False,
+        max_in_flight: int = 4,
+    ):
+        self.sio = sio
+        self.binary = binary
+        self.interval = 1 / max_fps
+        self.max_buffer = max_buffer
+        self.max_in_flight = max_in_flight
+        # frames sent but not acked yet
+        self.in_flight = 0
+        self.streams: dict[str, list] = {}
+        self.states: dict[str, any] = {}
+        self.buffered = 0
+        self.closed = False
+        # guards the buffers, producer waits on it when the buffers are full
+        self.condition = threading.Condition()
+        # a frame is taken & sent atomically, so frames are never sent out of order
+        self.send_lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def emit(self, event: str, data: any, callback: callable = None):
+        if event in STATE_EVENTS:
+            with self.condition:
+                self.states[event] = data
+                self.condition.notify_all()
+        elif event in STREAM_EVENTS:
+            # new_orders & fills are lists of orders, new_candle is a single candle
+            items = data if isinstance(data, list) else [data]
+            with self.condition:
+                self.condition.wait_for(lambda: self.buffered < self.max_buffer or self.closed)
+                self.streams.setdefault(event, []).extend(items)
+                self.buffered += len(items)
+                self.condition.notify_all()
+        else:
+            self.flush()
+            self.sio.emit(event, data, callback=callback)
+
+    def run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.has_pending() or self.closed)
+                if self.closed:
+                    return
+            self.flush()
+            # limit the frame rate, events emitted in the meantime are packed into the next frame
+            time.sleep(self.interval)
+
+    def has_pending(self) -> bool:
+        return bool(self.streams or self.states)
+
+    def take_frame(self) -> dict:
+        with self.condition:
+            frame = {**self.streams, **self.states}
+            self.streams, self.states = {}, {}
+            self.buffered = 0
+            self.condition.notify_all()
+        return frame
+
+    def flush(self):
+        with self.send_lock:
+            self.wait_for_acks()
+            frame = self.take_frame()
+            if frame:
+                if self.binary:
+                    self.encode(frame)
+                with self.condition:
+                    self.in_flight += 1
+                self.sio.emit("frame", frame, callback=self.on_ack)
+
+    def wait_for_acks(self):
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: self.in_flight < self.max_in_flight, timeout=ACK_TIMEOUT
+            ):
+                logger.warning(f"No ack for {self.in_flight} frames, resuming")
+                self.in_flight = 0
+
+    def on_ack(self, *args):
+        # called on the socket's thread with the server's response, which is unused
+        with self.condition:
+            self.in_flight = max(self.in_flight - 1, 0)
+            self.condition.notify_all()
+
+    def encode(self, frame: dict):
+        for event, encoder in STREAM_ENCODERS.items():
+            if event in frame:
+                frame[event] = encoder(frame[event])
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+        self.flush()
@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from backtest_env.batch import init_worker
+from backtest_env.constants import DATA_DIR
+from backtest_env.price_store import SharedPriceStore
+from backtest_env.strategies import STRATEGIES
+from backtest_env.utils import convert_datetime_to_nanosecond, filter_price_data, get_max_drawdown
+
+# Episode-parallel backtests, for strategies declaring an episode length (get_episode_length()).
+# At a boundary candle (open time % episode length == 0) the strategy cancels its orders & closes
+# its positions, so after it the account only differs from a fresh one by its balance, and the
+# rest of the state can be rebuilt from the <warm-up length> of candles before the boundary.
+# The candles are split at boundaries into chunks simulated on a process pool, each chunk starts
+# <warm-up length> before its first boundary and measures the equity from that boundary only, then
+# the equity deltas & fills of the chunks are merged in order.
+# Usage: python -m backtest_env.episodes config.json [-o result.json]
+
+
+def plan_chunks(
+    open_times: np.ndarray, episode_length: int, warmup_length: int, num_chunks: int
+) -> list[tuple[int, int, int]]:
+    # return (warm-up index, start index, end index) of each chunk, a chunk owns the candles in
+    # (start, end], the first chunk has no warm-up and starts at -1 so it owns the first candle too
+    boundaries = np.flatnonzero(open_times.astype(np.int64) % episode_length == 0)
+    boundaries = boundaries[boundaries > 0]
+    # boundaries closest to evenly spaced candles
+    targets = np.arange(1, num_chunks) * len(open_times) // num_chunks
+    positions = np.clip(np.searchsorted(boundaries, targets), 0, max(len(boundaries) - 1, 0))
+    splits = np.unique(boundaries[positions]).tolist() if len(boundaries) else []
+    starts = [-1] + splits
+    ends = splits + [len(open_times) - 1]
+    chunks = []
+    for start, end in zip(starts, ends, strict=True):
+        warmup = 0
+        if start > 0:
+            warmup = int(np.searchsorted(open_times, open_times[start] - warmup_length))
+        chunks.append((warmup, start, end))
+    return chunks
+
+
+def run_chunk(config: dict, warmup: int, start: int, end: int) -> dict:
+    strategy = STRATEGIES[config["strategy"]].from_cfg({**config, "allowLiveUpdates": False})
+    data = strategy.data
+    # one more candle than the chunk, so its last candle is updated like in the sequential run
+    # instead of being cleaned up (the last chunk ends with the last candle and is cleaned up)
+    data.narrow(warmup, end + 2)
+    start, end = start - warmup, end - warmup
+    position_manager = strategy.position_manager
+    filled_orders = strategy.order_manager.filled_orders
+
+    base = position_manager.balance.initial
+    num_fills = 0
+    equity = []
+    while data.step():
+        strategy.update() if data.has_next() else strategy.cleanup()
+        strategy.order_manager.flush_fills()
+        if data.idx == start:
+            base = position_manager.get_equity(data.get_close_price())
+            num_fills = len(filled_orders)
+        elif data.idx > start:
+            equity.append(position_manager.get_equity(data.get_close_price()))
+        if data.idx == end:
+            break
+    return {
+        "equity": (np.array(equity) - base).tolist(),
+        "fills": [order.json() for order in filled_orders[num_fills:]],
+    }
+
+
+def run_episodes(
+    config: dict,
+    num_chunks: int | None = None,
+    max_workers: int | None = None,
+    data_dir: str = DATA_DIR,
+) -> dict:
+    # same result keys as Strategy.get_result() with recorded equity, plus the equity curve and
+    # the filled orders
+    strategy_cls = STRATEGIES[config["strategy"]]
+    episode_length = strategy_cls.get_episode_length(config)
+    if not episode_length:
+        raise ValueError(f"{config['strategy']} has no episodes, run it sequentially")
+    max_workers = max_workers or os.cpu_count()
+
+    store = SharedPriceStore(data_dir)
+    handle = store.acquire(config["symbol"], config["timeframe"])
+    # same candles as the PriceDataSet of the strategy
+    start = convert_datetime_to_nanosecond(config["startTime"])
+    end = convert_datetime_to_nanosecond(config["endTime"]) if config.get("endTime") else 0
+    prices = filter_price_data(store.prices[(handle.symbol, handle.tf)], start, end)
+    # a few chunks per worker, so a worker that finishes early takes another one
+    chunks = plan_chunks(
+        prices[:, 0],
+        episode_length,
+        strategy_cls.get_warmup_length(config),
+        num_chunks or max_workers * 4,
+    )
+    with ProcessPoolExecutor(
+        max_workers, initializer=init_worker, initargs=([handle],)
+    ) as executor:
+        results = list(executor.map(run_chunk, repeat(config), *zip(*chunks, strict=True)))
+    store.close()
+
+    # each chunk starts from the equity at the end of the previous one
+    equity = []
+    offset = config["initialBalance"]
+    for result in results:
+        curve = np.array(result["equity"]) + offset
+        equity.append(curve)
+        if len(curve):
+            offset = curve[-1]
+    equity = np.concatenate(equity)
+    fills = [fill for result in results for fill in result["fills"]]
+    return {
+        "pnl": round(float(offset - config["initialBalance"]), 4),
+        "balance": float(offset),
+        "fills": len(fills),
+        "candles": len(prices),
+        "maxDrawdown": get_max_drawdown(equity),
+        "equity": equity.tolist(),
+        "filledOrders": fills,
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Backtest a strategy in parallel episodes")
+    parser.add_argument("config", help="JSON file of Args/TrendFollowerArgs")
+    parser.add_argument("-o", "--output", help="JSON file of the result, stdout by default")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunks", type=int, help="4 chunks per worker by default")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args(argv)
+
+    with open(args.config, "r") as f:
+        config = json.load(f)
+    result = run_episodes(config, args.chunks, args.workers, args.data_dir)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f)
+    else:
+        summary = {k: v for k, v in result.items() if k not in ("equity", "filledOrders")}
+        print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from math import inf
+
+import numpy as np
+
+# candles scanned by the first vectorized search, the next searches scan twice as many candles,
+# so a trigger close to the current candle is found without scanning years of data
+FIRST_CHUNK_SIZE = 256
+
+
+@dataclass
+class WakeUp:
+    # a strategy returns it from get_wake_up() when it doesn't need to see the next candles until:
+    # a candle opens at or after <time> (ms), or its low <= <lower>, or its high >= <upper>
+    time: float = inf
+    lower: float = -inf
+    upper: float = inf
+
+
+def find_next_candle(
+    prices: np.ndarray, start: int, trigger_prices: np.ndarray, wake_up: WakeUp
+) -> int:
+    # index of the first candle from <start> which crosses a pending order (low <= price <= high)
+    # or wakes the strategy up, len(prices) if there is none
+    # trigger_prices must be sorted
+    stop = len(prices)
+    if wake_up.time != inf:
+        stop = start + int(np.searchsorted(prices[start:, 0], wake_up.time, side="left"))
+    i, size = start, FIRST_CHUNK_SIZE
+    while i < stop:
+        j = min(i + size, stop)
+        lows, highs = prices[i:j, 3], prices[i:j, 2]
+        hits = (lows <= wake_up.lower) | (highs >= wake_up.upper)
+        if len(trigger_prices):
+            # the lowest order price >= low of each candle, the candle crosses it if it's <= high
+            k = np.searchsorted(trigger_prices, lows, side="left")
+            lowest = trigger_prices[np.minimum(k, len(trigger_prices) - 1)]
+            hits |= (k < len(trigger_prices)) & (lowest <= highs)
+        found = np.flatnonzero(hits)
+        if len(found):
+            return i + int(found[0])
+        i, size = j, size * 2
+    return stop
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from backtest_env.constants import FEATURE_CACHE_BYTES, FEATURE_DIR
+from backtest_env.indicators import (
+    atr,
+    daily_range,
+    ema,
+    rolling_max,
+    rolling_mean,
+    rolling_min,
+    rolling_std,
+)
+from backtest_env.utils import resample_price_data
+
+# Features are indicator columns computed with the batch functions of backtest_env.indicators over
+# all candles of a (symbol, timeframe), one value per candle. They're keyed by the content hash of
+# the candles, the feature name & its params, and saved as .npy files next to the price data, so
+# every backtest (and every process of a sweep) using the same feature memory-maps the same file
+# instead of computing it again. The least recently used files are deleted when the cache grows
+# over <max_bytes>. Features computed over the candles of a single backtest (see compute()) aren't
+# saved, their candles change with every startTime so they would only churn the cache.
+# Values at a candle only depend on that candle and the previous ones, the first values are nan
+# until the feature's window is full. Strategies read them with PriceDataSet.add_feature() and
+# PriceDataSet.get_feature()
+
+ONE_DAY = 86_400_000
+COLUMNS = {"open": 1, "high": 2, "low": 3, "close": 4}
+# content hash of the last hashed candles, by their memory (address, shape & strides) so views of
+# the same shared candles hit the cache. The arrays are kept, so their memory isn't reused by
+# other candles while they're cached
+HASH_CACHE_SIZE = 8
+content_hashes: OrderedDict[tuple, tuple[np.ndarray, str]] = OrderedDict()
+# backtests may run on a thread pool of the same process, the cache is shared by their threads
+hash_lock = threading.Lock()
+
+
+def sma(prices: np.ndarray, period: int, column: str = "close") -> np.ndarray:
+    return rolling_mean(prices[:, COLUMNS[column]], period)
+
+
+def std(prices: np.ndarray, period: int, column: str = "close") -> np.ndarray:
+    return rolling_std(prices[:, COLUMNS[column]], period)
+
+
+def exponential_mean(prices: np.ndarray, period: int, column: str = "close") -> np.ndarray:
+    return ema(prices[:, COLUMNS[column]], period)
+
+
+def average_true_range(prices: np.ndarray, period: int) -> np.ndarray:
+    return atr(prices[:, 2], prices[:, 3], prices[:, 4], period)
+
+
+def rolling_high(prices: np.ndarray, period: int) -> np.ndarray:
+    return rolling_max(prices[:, 2], period)
+
+
+def rolling_low(prices: np.ndarray, period: int) -> np.ndarray:
+    return rolling_min(prices[:, 3], period)
+
+
+def daily_change(prices: np.ndarray, period: int) -> np.ndarray:
+    # DailyRange of the last <period> daily bars, from the candle completing the last one of them,
+    # like TrendFollower's daily change
+    bars, completed = resample_price_data(prices, ONE_DAY)
+    if not len(bars):
+        return np.full(len(prices), np.nan)
+    opens = bars[:, 1].copy()
+    # the first day has no open candle if prices start after 00:00 UTC, its close is the open
+    if bars[0, 0] < prices[0, 0]:
+        opens[0] = bars[0, 4]
+    changes = daily_range(opens, bars[:, 2], bars[:, 3], period)
+    # each candle takes the value of the last daily bar completed at or before it
+    return np.where(completed > 0, changes[np.maximum(completed - 1, 0)], np.nan)
+
+
+FEATURES = {
+    "sma": sma,
+    "std": std,
+    "ema": exponential_mean,
+    "atr": average_true_range,
+    "rolling_high": rolling_high,
+    "rolling_low": rolling_low,
+    "daily_change": daily_change,
+}
+
+
+def compute(prices: np.ndarray, name: str, params: dict) -> np.ndarray:
+    if name not in FEATURES:
+        raise ValueError(f"Unknown feature: {name}, features: {list(FEATURES)}")
+    return FEATURES[name](prices, **params)
+
+
+def get_content_hash(prices: np.ndarray) -> str:
+    # hashing a multi-year array takes a while, backtests of a worker share the same attached
+    # array so it's hashed once per process
+    key = (prices.ctypes.data, prices.shape, prices.strides)
+    with hash_lock:
+        if key in content_hashes:
+            content_hashes.move_to_end(key)
+            return content_hashes[key][1]
+    digest = hashlib.blake2b(np.ascontiguousarray(prices).data, digest_size=16)
+    digest.update(str(prices.shape).encode())
+    with hash_lock:
+        content_hashes[key] = (prices, digest.hexdigest())
+        if len(content_hashes) > HASH_CACHE_SIZE:
+            content_hashes.popitem(last=False)
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    def __init__(self, directory: str = FEATURE_DIR, max_bytes: int = FEATURE_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def get(self, prices: np.ndarray, name: str, params: dict) -> np.ndarray:
+        # return the read-only feature column of <prices>, computed & saved on the first call
+        if name not in FEATURES:
+            raise ValueError(f"Unknown feature: {name}, features: {list(FEATURES)}")
+        path = self.get_path(get_content_hash(prices), name, params)
+        try:
+            column = np.load(path, mmap_mode="r")
+            # the modification time orders files for eviction
+            os.utime(path)
+            return column
+        except FileNotFoundError:
+            # not computed yet, or evicted by another process
+            pass
+        self.save(path, compute(prices, name, params))
+        self.evict(keep=path)
+        return np.load(path, mmap_mode="r")
+
+    def get_path(self, content_hash: str, name: str, params: dict) -> str:
+        params_hash = hashlib.blake2b(
+            json.dumps(params, sort_keys=True).encode(), digest_size=8
+        ).hexdigest()
+        return os.path.join(self.directory, f"{content_hash}_{name}_{params_hash}.npy")
+
+    def save(self, path: str, column: np.ndarray):
+        # processes of a sweep may compute the same feature at the same time, like the price cache
+        # the file is written to a temporary file then renamed, so readers never see a partial one
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_name = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_name, "wb") as f:
+            np.save(f, np.asarray(column, dtype=np.float64))
+        os.replace(tmp_name, path)
+
+    def evict(self, keep: str = ""):
+        # delete least recently used files until the cache fits in <max_bytes>
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npy") and entry.path != keep:
+                stat = entry.stat()
+                files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        if keep:
+            total += os.path.getsize(keep)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            # deleting a file doesn't unmap it from the processes using it
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+# feature store of this process, configure() points it to the data directory of a batch
+store = FeatureStore()
+
+
+def configure(directory: str, max_bytes: int = FEATURE_CACHE_BYTES):
+    global store
+    store = FeatureStore(directory, max_bytes)
+
+
+def get_store() -> FeatureStore:
+    return store
@@ -0,0 +1,271 @@
+from collections import deque
+from math import nan, sqrt
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Streaming indicators for strategies: each one is updated with the newest candle in O(1) and
+# keeps at most <period> values in a preallocated ring buffer. Their value is nan until <period>
+# values have been seen, like the leading values of the batch functions at the end of this module,
+# which compute the same indicator over a whole array (research, tests, vectorized backtests).
+
+
+class RingBuffer:
+    # fixed-size buffer of the last <size> values, a python list so reads don't box numpy scalars
+    def __init__(self, size: int):
+        assert size > 0
+        self.size = size
+        self.values = [0.0] * size
+        # number of values pushed so far, the next value is written at count % size
+        self.count = 0
+
+    def __len__(self) -> int:
+        return min(self.count, self.size)
+
+    def is_full(self) -> bool:
+        return self.count >= self.size
+
+    def push(self, value: float) -> float:
+        # return the evicted value, 0.0 while the buffer isn't full
+        i = self.count % self.size
+        evicted = self.values[i] if self.count >= self.size else 0.0
+        self.values[i] = value
+        self.count += 1
+        return evicted
+
+    def last(self) -> float:
+        return self.values[(self.count - 1) % self.size] if self.count else nan
+
+    def to_array(self) -> np.ndarray:
+        # oldest value first
+        i = self.count % self.size
+        if self.count < self.size:
+            return np.array(self.values[:i])
+        return np.array(self.values[i:] + self.values[:i])
+
+
+class RollingMean:
+    def __init__(self, period: int):
+        self.period = period
+        self.buffer = RingBuffer(period)
+        self.total = 0.0
+        self.value = nan
+
+    @property
+    def ready(self) -> bool:
+        return self.buffer.is_full()
+
+    def update(self, value: float) -> float:
+        self.total += value - self.buffer.push(value)
+        # the running total drifts with rounding errors, sum the buffer again once per period
+        if self.buffer.count % self.period == 0:
+            self.total = sum(self.buffer.values)
+        if self.ready:
+            self.value = self.total / self.period
+        return self.value
+
+
+class RollingStd:
+    # standard deviation with <ddof> delta degrees of freedom like np.std, updated with Welford's
+    # algorithm, it doesn't lose precision on large prices like a running sum of squares
+    def __init__(self, period: int, ddof: int = 0):
+        assert period > ddof
+        self.period = period
+        self.ddof = ddof
+        self.buffer = RingBuffer(period)
+        self.mean = 0.0
+        # sum of squared differences from the mean
+        self.m2 = 0.0
+        self.value = nan
+
+    @property
+    def ready(self) -> bool:
+        return self.buffer.is_full()
+
+    def update(self, value: float) -> float:
+        full = self.buffer.is_full()
+        evicted = self.buffer.push(value)
+        if full:
+            mean = self.mean + (value - evicted) / self.period
+            self.m2 += (value - evicted) * (value - mean + evicted - self.mean)
+            self.mean = mean
+        else:
+            delta = value - self.mean
+            self.mean += delta / self.buffer.count
+            self.m2 += delta * (value - self.mean)
+        if self.buffer.count % self.period == 0:
+            # same as RollingMean, remove the drift once per period
+            self.mean = sum(self.buffer.values) / self.period
+            self.m2 = sum((v - self.mean) ** 2 for v in self.buffer.values)
+        if self.ready:
+            self.value = sqrt(max(self.m2, 0.0) / (self.period - self.ddof))
+        return self.value
+
+
+class EMA:
+    # exponential moving average, seeded with the mean of the first <period> values
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.count = 0
+        self.total = 0.0
+        self.value = nan
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    def update(self, value: float) -> float:
+        self.count += 1
+        if self.count < self.period:
+            self.total += value
+        elif self.count == self.period:
+            self.value = (self.total + value) / self.period
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+
+class ATR:
+    # average true range with Wilder's smoothing, seeded with the mean of the first <period> true
+    # ranges. The true range of the first candle is its high - low
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.total = 0.0
+        self.prev_close = nan
+        self.value = nan
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = high - low
+        if self.count:
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.count += 1
+        if self.count < self.period:
+            self.total += true_range
+        elif self.count == self.period:
+            self.value = (self.total + true_range) / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + true_range) / self.period
+        return self.value
+
+
+class RollingMax:
+    # highest value of the last <period> values, the deque holds (index, value) of the values that
+    # can still become the highest one: values are decreasing from the front, so each value is
+    # pushed & popped once, O(1) amortized
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.candidates: deque[tuple[int, float]] = deque()
+        self.value = nan
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.period
+
+    def update(self, value: float) -> float:
+        candidates = self.candidates
+        while candidates and self.is_dominated(candidates[-1][1], value):
+            candidates.pop()
+        candidates.append((self.count, value))
+        if candidates[0][0] <= self.count - self.period:
+            candidates.popleft()
+        self.count += 1
+        if self.ready:
+            self.value = candidates[0][1]
+        return self.value
+
+    def is_dominated(self, old: float, new: float) -> bool:
+        return old <= new
+
+
+class RollingMin(RollingMax):
+    # lowest value of the last <period> values
+    def is_dominated(self, old: float, new: float) -> bool:
+        return old >= new
+
+
+class DailyRange:
+    # average range of daily candles in percentage: (high - low) / open of the last <period> ones,
+    # updated with each completed daily candle (see PriceDataSet.get_bars())
+    def __init__(self, period: int):
+        self.mean = RollingMean(period)
+        self.value = nan
+
+    @property
+    def ready(self) -> bool:
+        return self.mean.ready
+
+    def update(self, open_price: float, high: float, low: float) -> float:
+        self.value = self.mean.update(abs(high - low) / open_price)
+        return self.value
+
+
+def pad(values: np.ndarray, period: int) -> np.ndarray:
+    # prepend nan for the first <period - 1> candles, whose window isn't full
+    return np.concatenate([np.full(period - 1, nan), values])
+
+
+def rolling_mean(values: np.ndarray, period: int) -> np.ndarray:
+    if len(values) < period:
+        return np.full(len(values), nan)
+    return pad(sliding_window_view(values, period).mean(axis=1), period)
+
+
+def rolling_std(values: np.ndarray, period: int, ddof: int = 0) -> np.ndarray:
+    if len(values) < period:
+        return np.full(len(values), nan)
+    return pad(sliding_window_view(values, period).std(axis=1, ddof=ddof), period)
+
+
+def rolling_max(values: np.ndarray, period: int) -> np.ndarray:
+    if len(values) < period:
+        return np.full(len(values), nan)
+    return pad(sliding_window_view(values, period).max(axis=1), period)
+
+
+def rolling_min(values: np.ndarray, period: int) -> np.ndarray:
+    if len(values) < period:
+        return np.full(len(values), nan)
+    return pad(sliding_window_view(values, period).min(axis=1), period)
+
+
+def smooth(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    # recursive smoothing seeded with the mean of the first <period> values, it can't be
+    # vectorized without losing precision, so it's the only batch function with a python loop
+    result = np.full(len(values), nan)
+    if len(values) < period:
+        return result
+    value = values[:period].mean()
+    result[period - 1] = value
+    for i in range(period, len(values)):
+        value += alpha * (values[i] - value)
+        result[i] = value
+    return result
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    return smooth(np.asarray(values, dtype=np.float64), period, 2 / (period + 1))
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = np.concatenate([[nan], close[:-1]])
+    ranges = np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+    return np.fmax(high - low, ranges)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    # Wilder's smoothing is an EMA with alpha = 1 / period
+    return smooth(true_range(high, low, close), period, 1 / period)
+
+
+def daily_range(
+    open_price: np.ndarray, high: np.ndarray, low: np.ndarray, period: int
+) -> np.ndarray:
+    return rolling_mean(np.abs(high - low) / open_price, period)
@@ -0,0 +1,108 @@
+from itertools import count
+
+import numpy as np
+
+from backtest_env.base.order import Order, OrderType
+from backtest_env.base.side import OrderSide, PositionSide
+from backtest_env.order_book import PRICED_ORDER_TYPES
+
+ORDER_TYPE_CODES = {order_type: code for code, order_type in enumerate(OrderType)}
+SIDE_CODES = {OrderSide.BUY: 0, OrderSide.SELL: 1}
+POSITION_SIDE_CODES = {PositionSide.LONG: 0, PositionSide.SHORT: 1}
+ARRAY_FIELDS = ("price", "quantity", "side", "type", "position_side", "priced", "active", "seq")
+
+
+class VectorizedMatchingEngine:
+    """
+    Alternative to OrderBook's ladders for books with thousands of resting orders (grid sweeps):
+    pending orders are stored as parallel numpy arrays and a candle's fills are computed with
+    a single vectorized mask against its [low, high] range.
+    It has the same interface as OrderBook, crossed orders are returned in insertion order so
+    order.filled events are emitted in the same order as the default engine
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.price = np.zeros(capacity, dtype=np.float64)
+        self.quantity = np.zeros(capacity, dtype=np.float64)
+        self.side = np.zeros(capacity, dtype=np.int8)
+        self.type = np.zeros(capacity, dtype=np.int8)
+        self.position_side = np.zeros(capacity, dtype=np.int8)
+        # orders without a trigger price (market, close position,...) are matched on every candle
+        self.priced = np.zeros(capacity, dtype=bool)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.seq = np.zeros(capacity, dtype=np.int64)
+        self.orders: list[Order | None] = [None] * capacity
+        # order id -> slot in the arrays, removed orders leave free slots which are reused
+        self.slots: dict[str, int] = {}
+        self.free_slots: list[int] = []
+        # number of slots in use (active or free), the arrays are only scanned up to here
+        self.size = 0
+        self.counter = count()
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, order: Order) -> bool:
+        return order.id in self.slots
+
+    def add(self, order: Order):
+        if order.id in self.slots:
+            return
+        slot = self.free_slots.pop() if self.free_slots else self.allocate_slot()
+        self.price[slot] = order.price
+        self.quantity[slot] = order.quantity
+        self.side[slot] = SIDE_CODES[order.side]
+        self.type[slot] = ORDER_TYPE_CODES.get(order.type, -1)
+        self.position_side[slot] = POSITION_SIDE_CODES[order.position_side]
+        self.priced[slot] = order.type in PRICED_ORDER_TYPES
+        self.active[slot] = True
+        self.seq[slot] = next(self.counter)
+        self.orders[slot] = order
+        self.slots[order.id] = slot
+
+    def allocate_slot(self) -> int:
+        if self.size == len(self.orders):
+            self.grow()
+        self.size += 1
+        return self.size - 1
+
+    def grow(self):
+        capacity = 2 * len(self.orders)
+        for name in ARRAY_FIELDS:
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[: len(array)] = array
+            setattr(self, name, grown)
+        self.orders.extend([None] * (capacity - len(self.orders)))
+
+    def remove(self, order: Order):
+        slot = self.slots.pop(order.id, None)
+        if slot is None:
+            return
+        self.active[slot] = False
+        self.orders[slot] = None
+        if self.slots:
+            self.free_slots.append(slot)
+        else:
+            # book is empty, start filling the arrays from the beginning again
+            self.clear()
+
+    def clear(self):
+        self.active[: self.size] = False
+        self.orders[: self.size] = [None] * self.size
+        self.slots.clear()
+        self.free_slots.clear()
+        self.size = 0
+
+    def crossed(self, low: float, high: float) -> list[Order]:
+        n = self.size
+        if n == 0:
+            return []
+        price = self.price[:n]
+        mask = self.active[:n] & (~self.priced[:n] | ((price >= low) & (price <= high)))
+        slots = np.flatnonzero(mask)
+        # free slots are reused, so slot order isn't insertion order
+        if len(slots) > 1:
+            slots = slots[np.argsort(self.seq[slots], kind="stable")]
+        orders = self.orders
+        return [orders[slot] for slot in slots.tolist()]
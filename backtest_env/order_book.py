@@ -0,0 +1,121 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+from math import inf
+
+import numpy as np
+
+from backtest_env.base.order import Order, OrderType
+from backtest_env.base.side import OrderSide
+
+# these orders are filled only when a candle's [low, high] range contains their price
+PRICED_ORDER_TYPES = {OrderType.Limit, OrderType.Stop, OrderType.OCO}
+
+
+class OrderBook:
+    """
+    Pending orders indexed by price, one sorted ladder per side. Given a candle, we bisect the
+    ladders to find orders whose price is inside [low, high], so only those orders are updated
+    instead of every pending order. Orders without a trigger price (market, close position,...) are returned
+    for every candle, the same as before.
+    Orders of each side are also kept sorted by creation time, so side queries don't scan the book
+    """
+
+    def __init__(self):
+        # ladder entries are (price, seq, order), seq is unique so orders are never compared
+        self.ladders: dict[str, list[tuple[float, int, Order]]] = {
+            OrderSide.BUY: [],
+            OrderSide.SELL: [],
+        }
+        # every order of a side sorted by (created_at, seq), ties keep the insertion order
+        self.created: dict[str, list[tuple[int, int, Order]]] = {
+            OrderSide.BUY: [],
+            OrderSide.SELL: [],
+        }
+        self.unpriced: dict[str, tuple[int, Order]] = {}
+        # insertion sequence of each order, crossed orders are updated in the order they were added
+        self.seqs: dict[str, int] = {}
+        self.counter = count()
+
+    def __len__(self):
+        return len(self.seqs)
+
+    def __contains__(self, order: Order) -> bool:
+        return order.id in self.seqs
+
+    def add(self, order: Order):
+        if order.id in self.seqs:
+            return
+        seq = next(self.counter)
+        self.seqs[order.id] = seq
+        insort(self.created[order.side], (order.created_at, seq, order))
+        if order.type in PRICED_ORDER_TYPES:
+            insort(self.ladders[order.side], (order.price, seq, order))
+        else:
+            self.unpriced[order.id] = (seq, order)
+
+    def remove(self, order: Order):
+        seq = self.seqs.pop(order.id, None)
+        if seq is None:
+            return
+        created = self.created[order.side]
+        del created[bisect_left(created, (order.created_at, seq))]
+        if order.id in self.unpriced:
+            del self.unpriced[order.id]
+            return
+        ladder = self.ladders[order.side]
+        del ladder[bisect_left(ladder, (order.price, seq))]
+
+    def clear(self):
+        for ladder in self.ladders.values():
+            ladder.clear()
+        for created in self.created.values():
+            created.clear()
+        self.unpriced.clear()
+        self.seqs.clear()
+
+    def count(self, side: str) -> int:
+        return len(self.created[side])
+
+    def orders_by_side(self, side: str) -> list[Order]:
+        return [order for _, _, order in self.created[side]]
+
+    def latest(self, side: str) -> Order | None:
+        created = self.created[side]
+        return created[-1][2] if created else None
+
+    def best_price(self, side: str) -> float | None:
+        # only orders waiting for a trigger price are considered: highest bid & lowest ask
+        ladder = self.ladders[side]
+        if not ladder:
+            return None
+        return ladder[-1][0] if side == OrderSide.BUY else ladder[0][0]
+
+    def worst_price(self, side: str) -> float | None:
+        ladder = self.ladders[side]
+        if not ladder:
+            return None
+        return ladder[0][0] if side == OrderSide.BUY else ladder[-1][0]
+
+    def trigger_prices(self) -> np.ndarray | None:
+        # sorted prices of all orders, a candle that doesn't contain any of them fills nothing
+        # None when an order is filled by any candle (market, close position,...)
+        if self.unpriced:
+            return None
+        buy, sell = self.ladders[OrderSide.BUY], self.ladders[OrderSide.SELL]
+        return np.sort(np.array([entry[0] for entry in buy + sell], dtype=np.float64))
+
+    def crossed(self, low: float, high: float) -> list[Order]:
+        # (low,) is smaller than any entry priced at low and (high, inf) is greater than any entry
+        # priced at high, so the slice contains every order with low <= price <= high
+        hits = []
+        for ladder in self.ladders.values():
+            if ladder:
+                lo = bisect_left(ladder, (low,))
+                hits.extend(ladder[lo : bisect_right(ladder, (high, inf), lo)])
+        # unpriced orders are stored in insertion order, no need to sort them if nothing was crossed
+        if not hits:
+            return [order for _, order in self.unpriced.values()]
+        entries = list(self.unpriced.values())
+        entries.extend((seq, order) for _, seq, order in hits)
+        entries.sort(key=lambda entry: entry[0])
+        return [order for _, order in entries]
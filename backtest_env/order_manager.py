@@ -1,8 +1,11 @@
+import numpy as np
 from socketio import Client
 
-from backtest_env.base.event_hub import Event, EventHub
+from backtest_env.base.event_hub import EventBus, EventHub
 from backtest_env.base.order import Order
 from backtest_env.base.side import PositionSide, OrderSide
+from backtest_env.matching_engine import VectorizedMatchingEngine
+from backtest_env.order_book import OrderBook
 from backtest_env.orders.close_position import ClosePositionOrder
 from backtest_env.position_manager import PositionManager
 from backtest_env.price import PriceDataSet, Price
@@ -15,18 +18,32 @@ class OrderManager(EventHub):
         price_dataset: PriceDataSet,
         sio: Client = None,
         symbol: str = "",
+        matching_engine: OrderBook | VectorizedMatchingEngine = None,
+        bus: EventBus = None,
     ):
-        super().__init__(sio)
+        super().__init__(sio, bus)
         self.orders: dict[str, Order] = {}
+        # pending orders indexed by side, price and creation time
+        self.order_book = OrderBook()
+        # finds orders touched by the current candle, the order book does it by default.
+        # VectorizedMatchingEngine can be used instead for books with thousands of resting orders
+        self.matching_engine = matching_engine if matching_engine is not None else self.order_book
         self.filled_orders: list[Order] = []
+        # fills of the running process_orders() call, they're applied to positions in one pass
+        self.fill_batch: list[Order] = []
+        self.is_processing = False
+        # fills that haven't been sent to front-end yet, see flush_fills()
+        self.unreported_fills: list[Order] = []
         self.position_manager = position_manager
         self.price_dataset = price_dataset
         self.symbol = symbol
         self.setup_event_handlers()
 
     def setup_event_handlers(self):
-        self.subscribe("order.filled", self.on_order_filled)
-        self.subscribe("order.new", self.on_new_order)
+        # both events are published for every fill, handlers take the order directly (raw)
+        # so no Event is created
+        self.subscribe("order.filled", self.on_order_filled, raw=True)
+        self.subscribe("order.new", self.on_new_order, raw=True)
 
     def get_all_orders(self) -> list[Order]:
         return list(self.orders.values())
@@ -35,17 +52,39 @@ class OrderManager(EventHub):
         return self.filled_orders
 
     def add_order(self, order: Order):
+        self.bind(order)
         self.orders[order.id] = order
+        self.index_order(order)
         self.emit_to_frontend("new_orders", [order.json()])
 
     def add_orders(self, orders: list[Order]):
         for order in orders:
             # we don't call self.add_order() because want to trigger the new_orders event in bulk
+            self.bind(order)
             self.orders[order.id] = order
+            self.index_order(order)
         self.emit_to_frontend("new_orders", [order.json() for order in orders])
 
+    def bind(self, order: Order):
+        # orders are created by strategies without knowing the backtest's bus,
+        # they must publish their events (order.filled, order.new) to the same bus as us
+        order.event_bus = self.event_bus
+
+    def index_order(self, order: Order):
+        self.order_book.add(order)
+        if self.matching_engine is not self.order_book:
+            self.matching_engine.add(order)
+
+    def unindex_order(self, order: Order):
+        self.order_book.remove(order)
+        if self.matching_engine is not self.order_book:
+            self.matching_engine.remove(order)
+
     def cancel_all_orders(self):
         self.orders = {}
+        self.order_book.clear()
+        if self.matching_engine is not self.order_book:
+            self.matching_engine.clear()
         self.emit_to_frontend("current_orders", [])
 
     def close_all_positions(self, price: Price):
@@ -69,20 +108,59 @@ class OrderManager(EventHub):
         order.update(price)
 
     def get_orders_by_side(self, side: str) -> list[Order]:
-        orders = filter(lambda order: order.side == side, self.orders.values())
-        return sorted(orders, key=lambda x: x.created_at)
+        # sorted by creation time
+        return self.order_book.orders_by_side(side)
+
+    def count_orders_by_side(self, side: str) -> int:
+        return self.order_book.count(side)
+
+    def get_latest_order(self, side: str) -> Order | None:
+        return self.order_book.latest(side)
+
+    def get_best_price(self, side: str) -> float | None:
+        return self.order_book.best_price(side)
+
+    def get_worst_price(self, side: str) -> float | None:
+        return self.order_book.worst_price(side)
+
+    def get_trigger_prices(self) -> np.ndarray | None:
+        # the order book is always up-to-date, even when another matching engine is used
+        return self.order_book.trigger_prices()
 
     def process_orders(self):
-        for order in list(self.orders.values()):
-            order.update(self.price_dataset.get_current_price())
+        price = self.price_dataset.get_current_price()
+        self.is_processing = True
+        try:
+            # orders outside of [low, high] wouldn't be filled by update() anyway, skip them
+            for order in self.matching_engine.crossed(price.low, price.high):
+                order.update(price)
+        finally:
+            self.is_processing = False
+        self.apply_fills()
+
+    def apply_fills(self):
+        self.position_manager.fill_orders(self.fill_batch)
+        if self.sio:
+            self.unreported_fills.extend(self.fill_batch)
+        self.fill_batch = []
+
+    def flush_fills(self):
+        # called once per candle, so front-end receives at most one fills & one positions message
+        # no matter how many orders were filled in that candle
+        if not self.unreported_fills:
+            return
+        self.emit_to_frontend("fills", [order.json() for order in self.unreported_fills])
+        self.position_manager.emit_positions()
+        self.unreported_fills = []
 
-    def on_order_filled(self, event: Event):
-        order: Order = event.data
-        self.position_manager.fill(order)
+    def on_order_filled(self, order: Order):
         self.filled_orders.append(order)
-        self.emit_to_frontend("order_filled", order.json())
         del self.orders[order.id]
+        self.unindex_order(order)
+        self.fill_batch.append(order)
+        # orders filled outside of process_orders() (e.g. closing positions) are applied right away
+        if not self.is_processing:
+            self.apply_fills()
 
-    def on_new_order(self, event: Event):
-        order: Order = event.data
+    def on_new_order(self, order: Order):
         self.add_order(order)
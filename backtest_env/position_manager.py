@@ -1,15 +1,16 @@
+import numpy as np
 from socketio import Client
 
 from backtest_env.balance import Balance
-from backtest_env.base.event_hub import EventHub
+from backtest_env.base.event_hub import EventBus, EventHub
 from backtest_env.base.order import Order
 from backtest_env.base.side import PositionSide
 from backtest_env.position import LongPosition, ShortPosition, Position
 
 
 class PositionManager(EventHub):
-    def __init__(self, initial_balance: float, sio: Client = None):
-        super().__init__(sio)
+    def __init__(self, initial_balance: float, sio: Client = None, bus: EventBus = None):
+        super().__init__(sio, bus)
         self.balance = Balance(initial_balance, initial_balance, 0)
         self.long = LongPosition(self.balance)
         self.short = ShortPosition(self.balance)
@@ -21,11 +22,19 @@ class PositionManager(EventHub):
         self.emit_to_frontend("pnl", self.get_pnl(price))
 
     def fill(self, order: Order):
+        self.update_position(order)
+        self.emit_positions()
+
+    def fill_orders(self, orders: list[Order]):
+        # positions are emitted by the caller once all fills of a candle are applied
+        for order in orders:
+            self.update_position(order)
+
+    def update_position(self, order: Order):
         if order.position_side == PositionSide.LONG:
             self.long.update(order)
         else:
             self.short.update(order)
-        self.emit_positions()
 
     def get_positions(self) -> tuple[Position, Position]:
         return self.long, self.short
@@ -36,6 +45,17 @@ class PositionManager(EventHub):
     def get_unrealized_pnl(self, price: float) -> float:
         return round(self.long.get_pnl(price) + self.short.get_pnl(price), 4)
 
+    def get_equity(self, price: float) -> float:
+        # same as initial balance + get_pnl(price) without rounding, it's called after every candle
+        # when equity is recorded and round() dominates the cost
+        long_value, short_value = self.long.quantity * price, self.short.quantity * price
+        return float(self.balance.current + long_value + self.balance.margin - short_value)
+
+    def get_equity_curve(self, prices: np.ndarray) -> np.ndarray:
+        # get_equity() of each price, positions must not change in between
+        long_value, short_value = self.long.quantity * prices, self.short.quantity * prices
+        return self.balance.current + long_value + self.balance.margin - short_value
+
     def get_pnl(self, price: float):
         pnl = self.balance.get_pnl()
         # testing is not ended, so we must account for pnl of long & short position
@@ -1,18 +1,42 @@
+import threading
+from collections import OrderedDict
+
 import numpy as np
 from socketio import Client
 
-from backtest_env.base.event_hub import EventHub
+from backtest_env import feature_store, price_store
+from backtest_env.base.event_hub import EventBus, EventHub
 from backtest_env.constants import DATA_DIR
-from backtest_env.utils import load_price_data, convert_datetime_to_nanosecond
+from backtest_env.utils import (
+    convert_datetime_to_nanosecond,
+    filter_price_data,
+    get_price_file,
+    get_timeframe_length,
+    load_price_data,
+    read_price_data,
+    resample_price_data,
+)
+
+# resampled bars by (address & length of the candles, timeframe), see PriceDataSet.resample()
+RESAMPLE_CACHE_SIZE = 16
+resampled_prices: OrderedDict[tuple[int, int, str], tuple[np.ndarray, ...]] = OrderedDict()
+# backtests may run on a thread pool of the same process, the cache is shared by their threads
+resample_lock = threading.Lock()
 
 
 class Price:
+    __slots__ = ("open_time", "open", "high", "low", "close", "close_time")
+
     def __init__(self, open_time, open_price, high, low, close, close_time):
+        self.set(open_time, float(open_price), float(high), float(low), float(close), close_time)
+
+    def set(self, open_time, open_price: float, high: float, low: float, close: float, close_time):
+        # prices must be python floats already, only time needs to be converted to int
         self.open_time = int(open_time)
-        self.open = float(open_price)
-        self.high = float(high)
-        self.low = float(low)
-        self.close = float(close)
+        self.open = open_price
+        self.high = high
+        self.low = low
+        self.close = close
         self.close_time = int(close_time)
 
     def json(self):
@@ -26,38 +50,144 @@ class Price:
 
 
 class PriceDataSet(EventHub):
-    def __init__(self, symbol, tf, start_time: str, end_time: str = "", sio: Client = None):
-        super().__init__(sio)
+    def __init__(
+        self,
+        symbol,
+        tf,
+        start_time: str,
+        end_time: str = "",
+        sio: Client = None,
+        bus: EventBus = None,
+    ):
+        super().__init__(sio, bus)
         start = convert_datetime_to_nanosecond(start_time)
-        end = convert_datetime_to_nanosecond(end_time)
-
-        self.prices: np.ndarray = load_price_data(DATA_DIR, symbol, tf, start, end)
+        end = convert_datetime_to_nanosecond(end_time) if end_time else 0
+
+        # prices attached by the price store are shared with other processes, use them if possible
+        shared_prices = price_store.get_prices(symbol, tf)
+        if shared_prices is None:
+            self.prices: np.ndarray = load_price_data(DATA_DIR, symbol, tf, start, end)
+        else:
+            self.prices: np.ndarray = filter_price_data(shared_prices, start, end)
         self.idx = -1
+        # all candles of (symbol, tf), feature columns are computed over them, see add_feature()
+        self.symbol, self.tf = symbol, tf
+        self.source = shared_prices
+        # feature columns aligned with prices
+        self.features: dict[str, np.ndarray] = {}
+        # higher timeframe bars built from prices & the number of them completed at each candle
+        self.resampled: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        # the current candle, it's updated in-place by step() so accessing it doesn't allocate.
+        # Don't keep a reference to it across steps, use dataset[idx] to get a standalone copy
+        self.cursor = Price(0, 0, 0, 0, 0, 0)
 
     def get_current_price(self) -> Price:
-        return self[self.idx]
+        return self.cursor
 
     def get_open_price(self):
-        return self.get_current_price().open
+        return self.cursor.open
 
     def get_close_price(self):
-        return self.get_current_price().close
+        return self.cursor.close
 
     def get_close_time(self):
-        return self.get_current_price().close_time
+        return self.cursor.close_time
 
     def get_last_price(self):
         return self[-1]
 
+    def slice(self, start: int, end: int = 0) -> np.ndarray:
+        # candles whose open time is in [start, end], the result is a view so it's cheap to call
+        return filter_price_data(self.prices, start, end)
+
+    def window(self, n: int) -> np.ndarray:
+        # the last n candles up to the current one (included), future candles are never returned
+        return self.prices[max(self.idx - n + 1, 0) : self.idx + 1]
+
     def next(self) -> Price:
         return self[self.idx + 1]
 
-    def step(self):
+    def has_next(self) -> bool:
+        return self.idx + 1 < len(self.prices)
+
+    def narrow(self, start: int, end: int):
+        # keep prices[start:end] only, feature columns stay aligned with the candles
+        self.prices = self.prices[start:end]
+        self.features = {key: column[start:end] for key, column in self.features.items()}
+        self.resampled = {}
+
+    def resample(self, tf: str) -> tuple[np.ndarray, np.ndarray]:
+        # bars of a higher timeframe ("1h", "4h", "1d",...) built from prices in one pass, they're
+        # cached so backtests of a sweep sharing the same candles build them once
+        if tf not in self.resampled:
+            key = (self.prices.ctypes.data, len(self.prices), tf)
+            with resample_lock:
+                cached = resampled_prices.get(key)
+                if cached is not None:
+                    resampled_prices.move_to_end(key)
+            if cached is None:
+                # resampled outside of the lock, threads resampling other candles don't wait
+                bars, completed = resample_price_data(self.prices, get_timeframe_length(tf))
+                # prices are kept, so their address isn't reused by other candles
+                cached = (self.prices, bars, completed)
+                with resample_lock:
+                    resampled_prices[key] = cached
+                    if len(resampled_prices) > RESAMPLE_CACHE_SIZE:
+                        resampled_prices.popitem(last=False)
+            self.resampled[tf] = cached[1:]
+        return self.resampled[tf]
+
+    def count_bars(self, tf: str) -> int:
+        # number of <tf> bars completed at the current candle
+        completed = self.resample(tf)[1]
+        return int(completed[self.idx]) if self.idx >= 0 else 0
+
+    def get_bars(self, tf: str, n: int) -> np.ndarray:
+        # the last n completed <tf> bars at the current candle, bars still forming are never
+        # returned
+        count = self.count_bars(tf)
+        return self.resampled[tf][0][max(count - n, 0) : count]
+
+    def get_last_bar(self, tf: str) -> Price | None:
+        # the last completed <tf> bar, None until the first one is completed
+        count = self.count_bars(tf)
+        return Price(*self.resampled[tf][0][count - 1]) if count else None
+
+    def add_feature(self, key: str, name: str, warmup: bool = True, **params):
+        # precomputed indicator column of the feature store (see feature_store.py), read it with
+        # get_feature(key). With <warmup>, candles before startTime are included in its
+        # computation, otherwise it starts at the first candle like a streaming indicator and it's
+        # computed in memory: it only serves this backtest
+        if not warmup:
+            self.features[key] = feature_store.compute(self.prices, name, params)
+            return
+        if self.source is None:
+            self.source = read_price_data(get_price_file(DATA_DIR, self.symbol, self.tf))
+        start = int(np.searchsorted(self.source[:, 0], self.prices[0, 0])) if len(self) else 0
+        column = feature_store.get_store().get(self.source, name, params)
+        self.features[key] = column[start : start + len(self.prices)]
+
+    def get_feature(self, key: str) -> float:
+        # value at the current candle
+        return float(self.features[key][self.idx])
+
+    def get_feature_column(self, key: str) -> np.ndarray:
+        # values aligned with prices, a view of the memory-mapped column
+        return self.features[key]
+
+    def skip_to(self, idx: int):
+        # the next step() returns candle <idx>, candles in between are never emitted
+        self.idx = idx - 1
+
+    def step(self) -> Price | None:
         self.idx += 1
-        price = self.get_current_price()
-        if price:
-            self.emit_to_frontend("new_candle", price.json())
-        return price
+        if self.idx >= len(self.prices):
+            return None
+        # tolist() converts the whole row to python scalars in one call
+        self.cursor.set(*self.prices[self.idx].tolist())
+        if self.sio:
+            self.emit_to_frontend("new_candle", self.cursor.json())
+        return self.cursor
 
     def __len__(self):
         return len(self.prices)
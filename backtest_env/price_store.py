@@ -0,0 +1,84 @@
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from backtest_env.constants import DATA_DIR
+from backtest_env.utils import get_cache_name, get_price_file, read_price_data
+
+# prices attached to the current process, PriceDataSet looks them up before reading from disk
+attached_prices: dict[tuple[str, str], np.ndarray] = {}
+
+
+@dataclass(frozen=True)
+class PriceHandle:
+    # small & picklable, so it can be passed to backtest processes
+    symbol: str
+    tf: str
+    path: str
+
+
+class SharedPriceStore:
+    """
+    Lives in the server process. Candles of each (symbol, timeframe) are loaded once into
+    a memory-mapped .npy file, every backtest process maps the same file read-only, so the OS keeps
+    a single copy of the candles in RAM no matter how many backtests use them.
+    Entries are reference-counted and evicted when the last backtest using them exits
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+        self.prices: dict[tuple[str, str], np.ndarray] = {}
+        self.ref_counts: dict[tuple[str, str], int] = {}
+        # acquire() may be called from multiple threads, we don't want to build the same cache twice
+        self.lock = threading.Lock()
+
+    def acquire(self, symbol: str, tf: str) -> PriceHandle:
+        key = (symbol, tf)
+        file_name = get_price_file(self.data_dir, symbol, tf)
+        with self.lock:
+            if key not in self.prices:
+                # read_price_data() makes sure the .npy cache is up-to-date before workers map it
+                self.prices[key] = read_price_data(file_name)
+                self.ref_counts[key] = 0
+            self.ref_counts[key] += 1
+        return PriceHandle(symbol, tf, get_cache_name(file_name))
+
+    def release(self, handle: PriceHandle):
+        key = (handle.symbol, handle.tf)
+        with self.lock:
+            if key not in self.ref_counts:
+                return
+            self.ref_counts[key] -= 1
+            if self.ref_counts[key] == 0:
+                # dropping the last reference unmaps the file
+                del self.prices[key]
+                del self.ref_counts[key]
+
+    def close(self):
+        with self.lock:
+            self.prices = {}
+            self.ref_counts = {}
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return key in self.prices
+
+
+def attach(handle: PriceHandle) -> np.ndarray:
+    # called by backtest processes, np.load with mmap_mode="r" doesn't copy the data
+    prices = np.load(handle.path, mmap_mode="r")
+    register(handle.symbol, handle.tf, prices)
+    return prices
+
+
+def register(symbol: str, tf: str, prices: np.ndarray):
+    # prices registered here are used by every PriceDataSet of (symbol, tf) in this process
+    attached_prices[(symbol, tf)] = prices
+
+
+def detach(symbol: str, tf: str):
+    attached_prices.pop((symbol, tf), None)
+
+
+def get_prices(symbol: str, tf: str) -> np.ndarray | None:
+    return attached_prices.get((symbol, tf))
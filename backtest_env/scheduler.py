@@ -0,0 +1,122 @@
+import heapq
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from backtest_env.worker_pool import WorkerPool
+
+# number of started jobs used to compute the average wait time
+WAIT_HISTORY_SIZE = 100
+
+
+@dataclass(order=True)
+class Job:
+    # heap order: higher priority first, then first submitted first (FIFO)
+    sort_key: tuple[int, int]
+    id: str = field(compare=False)
+    args: tuple = field(compare=False)
+    submitted_at: float = field(compare=False, default_factory=time.monotonic)
+
+
+class JobScheduler:
+    """
+    Limits the number of backtests running at the same time to <max_concurrency>, the other ones
+    wait in a priority queue. Like the pool, it's driven by poll(): finished jobs free their slot
+    and the next queued jobs are started.
+    Clients are told their position in the queue with get_position_updates().
+    Work running outside of the pool (parameter sweeps) takes slots with reserve_free_slots()
+    """
+
+    def __init__(self, pool: WorkerPool, max_concurrency: int, on_finished: callable = None):
+        self.pool = pool
+        self.max_concurrency = max_concurrency
+        # called with the job id when a job finishes by itself
+        self.on_finished = on_finished
+        self.pool.on_finished = self.finish
+        self.queue: list[Job] = []
+        self.running: dict[str, Job] = {}
+        self.counter = itertools.count()
+        self.waits: deque[float] = deque(maxlen=WAIT_HISTORY_SIZE)
+        # last position sent to each queued job
+        self.positions: dict[str, int] = {}
+        # slots taken by work running outside of the pool
+        self.reserved = 0
+
+    def submit(self, job_id: str, *args, priority: int = 0) -> int:
+        # return the position of the job in the queue, 0 if it's started right away
+        job = Job((-priority, next(self.counter)), job_id, args)
+        heapq.heappush(self.queue, job)
+        self.schedule()
+        return self.get_position(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        if job_id in self.running:
+            del self.running[job_id]
+            self.pool.cancel(job_id)
+            self.schedule()
+            return True
+        for i, job in enumerate(self.queue):
+            if job.id == job_id:
+                self.queue.pop(i)
+                heapq.heapify(self.queue)
+                self.positions.pop(job_id, None)
+                return True
+        return False
+
+    def finish(self, job_id: str):
+        if self.running.pop(job_id, None) and self.on_finished:
+            self.on_finished(job_id)
+
+    def reserve_free_slots(self) -> int:
+        # take every free slot, return how many were taken
+        slots = max(self.max_concurrency - len(self.running) - self.reserved, 0)
+        self.reserved += slots
+        return slots
+
+    def release_slots(self, slots: int):
+        self.reserved -= slots
+        self.schedule()
+
+    def schedule(self):
+        while self.queue and len(self.running) + self.reserved < self.max_concurrency:
+            job = heapq.heappop(self.queue)
+            self.waits.append(time.monotonic() - job.submitted_at)
+            self.running[job.id] = job
+            self.positions.pop(job.id, None)
+            self.pool.submit(job.id, *job.args)
+
+    def poll(self):
+        self.pool.poll()
+        self.schedule()
+
+    def get_position(self, job_id: str) -> int:
+        # 1-based position in the queue, 0 when the job isn't queued
+        for position, job in enumerate(sorted(self.queue), 1):
+            if job.id == job_id:
+                return position
+        return 0
+
+    def get_position_updates(self) -> dict[str, int]:
+        # positions of queued jobs that changed since the last call
+        positions = {job.id: position for position, job in enumerate(sorted(self.queue), 1)}
+        updates = {
+            job_id: position
+            for job_id, position in positions.items()
+            if self.positions.get(job_id) != position
+        }
+        self.positions = positions
+        return updates
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "maxConcurrency": self.max_concurrency,
+            "running": len(self.running),
+            "reserved": self.reserved,
+            "queued": len(self.queue),
+            # seconds the oldest queued job has been waiting
+            "longestWait": max((now - job.submitted_at for job in self.queue), default=0.0),
+            # seconds the last started jobs waited in the queue
+            "averageWait": sum(self.waits) / len(self.waits) if self.waits else 0.0,
+        }
@@ -5,13 +5,15 @@ from backtest_env.dto import Args
 from backtest_env.base.strategy import Strategy
 from backtest_env.orders.market import MarketOrder
 from backtest_env.constants import ORDER_SIZE
+from backtest_env.fast_forward import WakeUp
 
 
 class Baseline(Strategy):
     # this strategy represents as an example of real trading strategy
     def __init__(self, args: Args):
         super().__init__(args)
-        random.seed(1993)
+        # don't seed the global generator, other backtests may run in the same process
+        self.random = random.Random(1993)
 
     def update(self):
         self.update_orders_and_positions()
@@ -25,13 +27,24 @@ class Baseline(Strategy):
         if pnl > 1 or pnl < -1:
             self.order_manager.close_all_positions(self.data.get_current_price())
 
+    def get_wake_up(self) -> WakeUp | None:
+        # with one open position and no pending order, nothing happens until its pnl leaves [-1, 1]
+        if self.order_manager.get_all_orders():
+            return None
+        active = [pos for pos in self.position_manager.get_positions() if pos.is_active()]
+        if len(active) != 1:
+            return None
+        # |pnl| = quantity * |close - average price|, the band is a bit narrower for rounding errors
+        band = 0.999 / active[0].quantity
+        return WakeUp(lower=active[0].average_price - band, upper=active[0].average_price + band)
+
     def look_for_opportunities(self):
         pending_orders = self.order_manager.get_all_orders()
 
         if len(pending_orders) >= 1 or self.position_manager.get_total_active_positions() >= 1:
             return
 
-        side = OrderSide.BUY if random.random() <= 0.5 else OrderSide.SELL
+        side = OrderSide.BUY if self.random.random() <= 0.5 else OrderSide.SELL
 
         order = MarketOrder(
             side,
@@ -4,6 +4,8 @@ from backtest_env.base.side import OrderSide
 from backtest_env.utils import get_tp
 from backtest_env.dto import TrendFollowerArgs
 from backtest_env.base.strategy import Strategy
+from backtest_env.fast_forward import WakeUp
+from backtest_env.indicators import DailyRange
 from backtest_env.orders.limit import LimitOrder
 
 
@@ -39,15 +41,26 @@ class TrendFollower(Strategy):
 
         # number of 1d candles being stored to calculate daily average change
         self.candle_cache_size = args.candleCacheSize
-        self.candles = []
-        # these values will be used to form daily candle based on smaller candles data
-        self.open, self.high, self.low, self.close = 0.0, 0.0, np.inf, 0.0
+        # number of daily candles (see PriceDataSet.resample()) added to daily_change
+        self.num_days = 0
+        # daily change in percentage: (high - low) / open, averaged over the last daily candles
+        self.daily_change = DailyRange(self.candle_cache_size)
 
     @classmethod
     def from_cfg(cls, kwargs):
         args = TrendFollowerArgs(**kwargs)
         return cls(args)
 
+    @classmethod
+    def get_episode_length(cls, kwargs):
+        # positions & orders are closed at the first candle of each day, see is_episode_end()
+        return 86_400_000
+
+    @classmethod
+    def get_warmup_length(cls, kwargs):
+        # the step size is computed from the last <candleCacheSize> daily candles
+        return kwargs["candleCacheSize"] * 86_400_000
+
     @classmethod
     def get_required_params(cls):
         return {
@@ -66,9 +79,21 @@ class TrendFollower(Strategy):
             self.order_manager.close_all_positions(self.data.get_current_price())
 
         # only start the strategy when we've collected enough daily candles
-        if len(self.candles) >= self.candle_cache_size:
+        if self.daily_change.ready:
             self.update_grid()
 
+    def get_wake_up(self) -> WakeUp:
+        # between two fills, the state only changes at the candle completing a daily candle (new
+        # step size, first grid orders once the daily change is ready) and at the first candle of
+        # a day (episode end)
+        price = self.data.get_current_price()
+        next_day = (price.open_time // 86_400_000 + 1) * 86_400_000
+        completed = self.data.resample("1d")[1]
+        i = int(np.searchsorted(completed, completed[self.data.idx], side="right"))
+        if i < len(completed):
+            return WakeUp(time=min(self.data.prices[i, 0], next_day))
+        return WakeUp(time=next_day)
+
     def is_episode_end(self) -> bool:
         # check if current candle is the first candle in the day (open time = 00:00:00 AM GMT)
         # time is in millisecond, so we use 86_400_000
@@ -77,52 +102,37 @@ class TrendFollower(Strategy):
         return price.open_time % 86_400_000 == 0
 
     def update_statistic(self):
-        self.update_candle_cache()
+        # daily candles completed since the last update, more than one if candles were skipped
+        num_days = self.data.count_bars("1d")
+        if num_days == self.num_days:
+            return
+        bars = self.data.get_bars("1d", num_days - self.num_days)
+        for open_time, open_price, high, low, close in bars[:, :5].tolist():
+            # edge case, the first day has no open candle (backtest started after 00:00 UTC), use
+            # its close as open
+            if open_time < self.data.prices[0, 0]:
+                open_price = close
+            self.daily_change.update(open_price, high, low)
+        self.num_days = num_days
         # calculate step_size if we've gathered enough candles
-        if len(self.candles) >= self.candle_cache_size:
+        if self.daily_change.ready:
             self.update_step_size()
 
-    def update_candle_cache(self):
-        price = self.data.get_current_price()
-        # maintain a running high and low to store the highest, lowest price in a day
-        self.high = max(self.high, price.high)
-        self.low = min(self.low, price.low)
-
-        # to check for open time in candle, just mod it with 86_400_000
-        if price.open_time % 86_400_000 == 0:
-            self.open = price.open
-        # close time is smaller than next open time by 1 millisecond
-        if (int(price.close_time) + 1) % 86_400_000 == 0:
-            self.close = price.close
-            self.store_new_candle()
-
-    def store_new_candle(self):
-        # edge case, no open candle
-        if self.open == 0:
-            self.open = self.close
-
-        self.candles.append((self.open, self.high, self.low, self.close))
-        # reset variables, open & close aren't included because their value are determined by time
-        self.high, self.low = 0.0, np.inf
-
     def update_step_size(self):
-        prices = np.array(self.candles[-self.candle_cache_size :])
-        # our formula for determine change per day is: (high - low) / open / step
-        changes = np.abs(prices[:, 1] - prices[:, 2]) / prices[:, 0]
         # step_size can't be too small, so we set 0.005 (0.5%) as minimum
-        self.step_size = round(max(np.mean(changes) / self.interval, 0.005), 3)
+        self.step_size = round(max(self.daily_change.value / self.interval, 0.005), 3)
 
     def update_grid(self):
         self.place_grid_orders(OrderSide.BUY)
         self.place_grid_orders(OrderSide.SELL)
 
     def place_grid_orders(self, order_side: str):
-        orders = self.order_manager.get_orders_by_side(side=order_side)
-        num_pending_orders = self.grid_size - len(orders)
+        num_pending_orders = self.grid_size - self.order_manager.count_orders_by_side(order_side)
         assert num_pending_orders >= 0
         # determine entry price for new order, use current price if grid is empty
         # else use the latest order's price as starting point
-        price = self.data.get_close_price() if not orders else orders[-1].price
+        latest_order = self.order_manager.get_latest_order(order_side)
+        price = self.data.get_close_price() if latest_order is None else latest_order.price
 
         for i in range(0, num_pending_orders):
             price = get_tp(price, self.step_size, order_side)
@@ -0,0 +1,223 @@
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import random
+import sys
+
+import numpy as np
+
+from backtest_env.batch import run_batch
+from backtest_env.constants import DATA_DIR
+from backtest_env.strategies import STRATEGIES
+from backtest_env.utils import (
+    convert_datetime_to_nanosecond,
+    convert_nanosecond_to_datetime,
+    load_price_data,
+)
+
+# Parameter sweeps: a base config + a search space over the strategy's required params, every
+# combination is a backtest run by the batch runner (process pool sharing the price data).
+# A search space maps a param, by its display name ("Grid Size") or field name ("gridSize"), to:
+# - a list of values: [3, 5, 10]
+# - a range: {"min": 2, "max": 10, "step": 2}, step is only used by grid search
+# Usage: python -m backtest_env.sweep sweep.json [-o results.csv], sweep.json has the keys of
+# run_sweep(): {"config": {...}, "space": {...}, "method": "random", "samples": 1000,
+# "halving": {"eta": 3, "rungs": 4, "metric": "pnl"}}, "halving" is optional
+
+# result columns besides the params, in table order
+METRICS = ["pnl", "maxDrawdown", "fills", "error"]
+# lower is better for these metrics, higher is better for the others
+MINIMIZED_METRICS = {"maxDrawdown"}
+ONE_DAY = 86_400_000
+
+
+def to_field_name(name: str) -> str:
+    # "Candle Cache Size" -> "candleCacheSize", field names are returned as is
+    words = name.split()
+    return words[0][0].lower() + words[0][1:] + "".join(word.capitalize() for word in words[1:])
+
+
+def get_param_types(strategy: str) -> dict[str, str]:
+    params = STRATEGIES[strategy].get_required_params()
+    return {to_field_name(name): param["type"] for name, param in params.items()}
+
+
+def normalize_space(strategy: str, space: dict) -> dict:
+    types = get_param_types(strategy)
+    normalized = {}
+    for name, values in space.items():
+        field = to_field_name(name)
+        if field not in types:
+            raise ValueError(f"{strategy} has no param {name}, params: {list(types)}")
+        normalized[field] = values
+    return normalized
+
+
+def get_grid_values(values: list | dict, param_type: str) -> list:
+    if isinstance(values, list):
+        return values
+    # include max, np.arange excludes it
+    grid = np.arange(
+        values["min"], values["max"] + values.get("step", 1) / 2, values.get("step", 1)
+    )
+    return [int(v) if param_type == "int" else round(float(v), 10) for v in grid]
+
+
+def sample_value(values: list | dict, param_type: str, rng: random.Random):
+    if isinstance(values, list):
+        return rng.choice(values)
+    if param_type == "int":
+        return rng.randint(values["min"], values["max"])
+    return rng.uniform(values["min"], values["max"])
+
+
+def expand_grid(strategy: str, space: dict) -> list[dict]:
+    types = get_param_types(strategy)
+    space = normalize_space(strategy, space)
+    fields = list(space)
+    grids = [get_grid_values(space[field], types[field]) for field in fields]
+    return [dict(zip(fields, values, strict=True)) for values in itertools.product(*grids)]
+
+
+def expand_random(strategy: str, space: dict, samples: int, seed: int = 0) -> list[dict]:
+    types = get_param_types(strategy)
+    space = normalize_space(strategy, space)
+    rng = random.Random(seed)
+    return [
+        {field: sample_value(values, types[field], rng) for field, values in space.items()}
+        for _ in range(samples)
+    ]
+
+
+def expand_space(
+    strategy: str, space: dict, method: str = "grid", samples: int = 100, seed: int = 0
+) -> list[dict]:
+    if method == "grid":
+        return expand_grid(strategy, space)
+    if method == "random":
+        return expand_random(strategy, space, samples, seed)
+    raise ValueError(f"Unknown search method: {method}, use grid or random")
+
+
+def run_sweep(
+    config: dict,
+    space: dict,
+    method: str = "grid",
+    samples: int = 100,
+    seed: int = 0,
+    halving: dict | None = None,
+    max_workers: int | None = None,
+    data_dir: str = DATA_DIR,
+) -> list[dict]:
+    # return one row per combination: its params and metrics, best pnl first
+    # with <halving> (kwargs of run_halving()), bad combinations are pruned on shorter ranges
+    combinations = expand_space(config["strategy"], space, method, samples, seed)
+    if halving is not None:
+        return run_halving(
+            config, combinations, **halving, max_workers=max_workers, data_dir=data_dir
+        )
+    return sort_rows(run_combinations(config, combinations, max_workers, data_dir), "pnl")
+
+
+def run_combinations(
+    config: dict, combinations: list[dict], max_workers: int | None, data_dir: str
+) -> list[dict]:
+    # rows are in the same order as combinations
+    configs = [{**config, **params, "recordEquity": True} for params in combinations]
+    rows = [None] * len(configs)
+    for result in run_batch(configs, max_workers, data_dir):
+        params = combinations[result["index"]]
+        rows[result["index"]] = {
+            **params,
+            **{metric: result[metric] for metric in METRICS if metric in result},
+        }
+    return rows
+
+
+def sort_rows(rows: list[dict], metric: str) -> list[dict]:
+    # best first, failed backtests last
+    sign = -1 if metric in MINIMIZED_METRICS else 1
+    return sorted(rows, key=lambda row: sign * row.get(metric, sign * -np.inf), reverse=True)
+
+
+def run_halving(
+    config: dict,
+    combinations: list[dict],
+    eta: int = 3,
+    rungs: int = 4,
+    metric: str = "pnl",
+    max_workers: int | None = None,
+    data_dir: str = DATA_DIR,
+) -> list[dict]:
+    """
+    Successive halving: all combinations run on the first 1/eta^(rungs-1) of the date range, the
+    best 1/eta of them by <metric> run again on an eta times longer range, and so on until the
+    last rung runs the survivors on the full range. Each rung costs about as much as the first
+    one, so the whole search costs ~rungs/eta^(rungs-1) of a full sweep (4/27 with the defaults).
+    Return the survivors ranked on the full range, then the pruned combinations ranked by the
+    rung they reached. Each row has the "rung" it was last run on and the "endTime" of that rung
+    """
+    if not combinations:
+        return []
+    start, end = get_time_range(config, data_dir)
+    ranked = []
+    pruned = []
+    for rung in range(rungs):
+        rung_config = dict(config)
+        if rung < rungs - 1:
+            fraction = eta ** (rung - rungs + 1)
+            # endTime is a date, the range is at least one day
+            rung_end = max(start + (end - start) * fraction, start + ONE_DAY)
+            rung_config["endTime"] = convert_nanosecond_to_datetime(rung_end)
+        rows = run_combinations(rung_config, combinations, max_workers, data_dir)
+        for row in rows:
+            row["rung"], row["endTime"] = rung, rung_config["endTime"]
+        ranked = sort_rows(rows, metric)
+        if rung == rungs - 1:
+            break
+        survivors = max(1, math.ceil(len(ranked) / eta))
+        pruned = ranked[survivors:] + pruned
+        combinations = [
+            {field: row[field] for field in combinations[0]} for row in ranked[:survivors]
+        ]
+    return ranked + pruned
+
+
+def get_time_range(config: dict, data_dir: str) -> tuple[int, int]:
+    # open time of the first & last candles of the config
+    start = convert_datetime_to_nanosecond(config["startTime"])
+    end = convert_datetime_to_nanosecond(config["endTime"]) if config.get("endTime") else 0
+    prices = load_price_data(data_dir, config["symbol"], config["timeframe"], start, end)
+    return int(prices[0, 0]), int(prices[-1, 0])
+
+
+def write_table(rows: list[dict], f):
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    writer = csv.DictWriter(f, fieldnames=columns)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Sweep the params of a strategy")
+    parser.add_argument("sweep", help="JSON file with config, space, method, samples & seed")
+    parser.add_argument("-o", "--output", help="csv file of results, stdout by default")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args(argv)
+
+    with open(args.sweep, "r") as f:
+        sweep = json.load(f)
+    rows = run_sweep(**sweep, max_workers=args.workers, data_dir=args.data_dir)
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            write_table(rows, f)
+    else:
+        write_table(rows, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,18 +8,101 @@ from os.path import join
 
 from backtest_env.constants import DATA_DIR
 
+DATE_FORMAT = "%Y-%m-%d"
+# startTime & endTime may also have a time of day
+DATETIME_FORMAT = "%Y-%m-%d %H:%M"
+
 
 def load_price_data(data_dir: str, symbol: str, tf: str, start: int, end: int = 0) -> np.ndarray:
-    file_name = join(data_dir, symbol + "_" + tf + ".csv")
-    # use np.genfromtxt instead of pandas.read_csv so pandas is not a dependency
-    data = np.genfromtxt(file_name, delimiter=",", skip_header=1)
-    # filter data by start and end time
-    # data must be in range of [start, end]
-    # end's default value is zero, we have to increase it to np.inf if necessary
-    end = np.inf if end == 0 else end
-    mask = (data[:, 0] >= start) & (data[:, 0] <= end)
+    data = read_price_data(get_price_file(data_dir, symbol, tf))
+    return filter_price_data(data, start, end)
+
+
+def filter_price_data(data: np.ndarray, start: int, end: int = 0) -> np.ndarray:
+    # data must be in range of [start, end], end's default value is zero which means no upper bound
+    # candles are sorted by open time, so we binary search the boundaries and return a view
+    # instead of masking (and copying) the whole array
+    open_times = data[:, 0]
+    lo = np.searchsorted(open_times, start, side="left")
+    hi = len(data) if end == 0 else np.searchsorted(open_times, end, side="right")
+    return data[lo:hi]
+
+
+def get_timeframe_length(tf: str) -> int:
+    # "15m" -> 900_000, in millisecond like open & close times
+    units = {"m": 60_000, "h": 3_600_000, "d": 86_400_000}
+    if len(tf) < 2 or tf[-1] not in units or not tf[:-1].isdigit():
+        raise ValueError(f"Unsupported timeframe: {tf}, use <n>m, <n>h or <n>d")
+    return int(tf[:-1]) * units[tf[-1]]
+
+
+def resample_price_data(data: np.ndarray, tf_length: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    build candles of a higher timeframe from smaller candles, bars start at multiples of
+    tf_length since the epoch (00:00 UTC for daily bars)
+    :param data: candles sorted by open time, in the csv column layout
+    :param tf_length: timeframe of the bars in millisecond
+    :return: the bars, in the same column layout, and the number of bars completed at each candle
+    """
+    if len(data) == 0:
+        return np.zeros((0, 6)), np.zeros(0, dtype=np.int64)
+    buckets = data[:, 0].astype(np.int64) // tf_length
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(data)])) - 1
+    open_times = buckets[starts] * tf_length
+    close_times = open_times + tf_length - 1
+    bars = np.column_stack(
+        (
+            open_times,
+            data[starts, 1],
+            np.maximum.reduceat(data[:, 2], starts),
+            np.minimum.reduceat(data[:, 3], starts),
+            data[ends, 4],
+            close_times,
+        )
+    )
+    # a bar is completed by the candle closing at its close time, if that candle is missing we only
+    # know it's completed at the first candle of the next bar
+    completed_at = np.where(data[ends, 5] >= close_times, ends, ends + 1)
+    completed = np.searchsorted(completed_at, np.arange(len(data)), side="right")
+    return bars, completed
+
+
+def get_price_file(data_dir: str, symbol: str, tf: str) -> str:
+    return join(data_dir, symbol + "_" + tf + ".csv")
 
-    return data[mask]
+
+def read_price_data(file_name: str) -> np.ndarray:
+    # parsing a multi-year csv is slow, so we convert it once to a binary .npy file stored next to
+    # the csv and memory-map that file on the next runs
+    cache_name = get_cache_name(file_name)
+    if not is_cache_valid(file_name, cache_name):
+        build_cache(file_name, cache_name)
+    return np.load(cache_name, mmap_mode="r")
+
+
+def get_cache_name(file_name: str) -> str:
+    return os.path.splitext(file_name)[0] + ".npy"
+
+
+def is_cache_valid(file_name: str, cache_name: str) -> bool:
+    # build_cache() copies the csv's mtime to the cache file, so any change of the csv
+    # (even replacing it by an older file) invalidates the cache
+    if not os.path.exists(cache_name):
+        return False
+    return os.stat(cache_name).st_mtime_ns == os.stat(file_name).st_mtime_ns
+
+
+def build_cache(file_name: str, cache_name: str):
+    # use np.genfromtxt instead of pandas.read_csv so pandas is not a dependency
+    data = np.genfromtxt(file_name, delimiter=",", skip_header=1, ndmin=2)
+    # write to a temporary file then rename it, so concurrent backtests never read a partial cache
+    tmp_name = f"{cache_name}.{os.getpid()}.tmp"
+    with open(tmp_name, "wb") as f:
+        np.save(f, data)
+    source_mtime = os.stat(file_name).st_mtime_ns
+    os.utime(tmp_name, ns=(source_mtime, source_mtime))
+    os.replace(tmp_name, cache_name)
 
 
 def get_sl(price: float, percent: float, side: str) -> float:
@@ -44,12 +127,26 @@ def get_tp(price: float, percent: float, side: str) -> float:
     return round(price * (1 + percent) if side == "Buy" else price * (1 - percent), 4)
 
 
-def convert_datetime_to_nanosecond(date: str, date_format: str = "%Y-%m-%d") -> int:
+def get_max_drawdown(equity: np.ndarray) -> float:
+    """
+    get the largest drop of an equity curve from its previous peak
+    :param equity: account value after each candle
+    :return: drawdown in percent of the peak, 0.05 means the equity fell 5% below its peak
+    """
+    if len(equity) == 0:
+        return 0.0
+    peaks = np.maximum.accumulate(equity)
+    return round(float(np.max((peaks - equity) / peaks)), 6)
+
+
+def convert_datetime_to_nanosecond(date: str, date_format: str | None = None) -> int:
+    if date_format is None:
+        date_format = DATETIME_FORMAT if " " in date else DATE_FORMAT
     return int(datetime.strptime(date, date_format).timestamp()) * 1000
 
 
-def convert_nanosecond_to_datetime(nanosecond: int | float) -> str:
-    return datetime.fromtimestamp(nanosecond // 1000).strftime("%Y-%m-%d")
+def convert_nanosecond_to_datetime(nanosecond: int | float, date_format: str = DATE_FORMAT) -> str:
+    return datetime.fromtimestamp(nanosecond // 1000).strftime(date_format)
 
 
 def extract_metadata_from_file(name: str):
@@ -0,0 +1,198 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from backtest_env.base.side import OrderSide, PositionSide
+from backtest_env.constants import ORDER_SIZE
+from backtest_env.utils import get_max_drawdown
+
+# Vectorized backtests of signal strategies (base/signal_strategy.py): fills, positions, balance &
+# equity of all candles are computed with numpy, no order object is created. It follows the event
+# loop of Strategy.run() with market orders only:
+# - an entry at candle t is a market order at the close of t, it's filled at candle t + 1 (before
+#   the exit of t + 1), entries of the last 2 candles are never filled: the order of the second to
+#   last candle is cancelled by cleanup()
+# - an exit at candle t closes all positions at the close of t, cleanup() closes them at the last
+#   candle
+# and the accounting of LongPosition/ShortPosition: buying a long spends the balance, selling a
+# short adds to the margin, the margin goes back to the balance when the short is closed.
+# Quantities are summed before rounding, so average prices of pyramided positions may differ from
+# the event loop by rounding errors
+
+
+@dataclass
+class Signals:
+    # one value per candle, entries are booleans (an order of ORDER_SIZE usd) or usd amounts,
+    # None means no signal
+    long_entries: np.ndarray | None = None
+    short_entries: np.ndarray | None = None
+    # close all positions at the candle's close
+    exits: np.ndarray | None = None
+
+
+def get_sizes(entries: np.ndarray | None, n: int) -> np.ndarray:
+    # usd amount of the market order placed at each candle, 0 means no order
+    if entries is None:
+        return np.zeros(n)
+    entries = np.asarray(entries)
+    if entries.dtype == np.bool_:
+        return np.where(entries, float(ORDER_SIZE), 0.0)
+    return entries.astype(np.float64)
+
+
+def get_exits(exits: np.ndarray | None, n: int) -> np.ndarray:
+    return np.zeros(n, dtype=np.bool_) if exits is None else np.asarray(exits, dtype=np.bool_)
+
+
+def get_fills(sizes: np.ndarray, close: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # quantity & price of the order filled at each candle, the order of candle t is filled at t + 1
+    prices = np.concatenate(([0.0], close[:-1]))
+    amounts = np.concatenate(([0.0], sizes[:-1]))
+    amounts[-1:] = 0.0
+    quantities = np.round(
+        np.divide(amounts, prices, out=np.zeros_like(prices), where=amounts > 0), 4
+    )
+    return quantities, prices
+
+
+def since_last_exit(totals: np.ndarray, last_exit: np.ndarray) -> np.ndarray:
+    # running totals minus their value at the given exits (-1: no exit yet)
+    return totals - np.concatenate(([0.0], totals))[last_exit + 1]
+
+
+def get_position(
+    sizes: np.ndarray, close: np.ndarray, exits: np.ndarray, last_exit: np.ndarray
+) -> dict[str, np.ndarray]:
+    # one side (long or short) of the account at each candle, <exits> are the indices of the exits
+    fills, fill_prices = get_fills(sizes, close)
+    total_quantity, total_cost = np.cumsum(fills), np.cumsum(fills * fill_prices)
+    quantity = np.round(since_last_exit(total_quantity, last_exit), 4)
+    cost = since_last_exit(total_cost, last_exit)
+    # fills of a candle are applied before its exit, so they're closed too
+    closed, closed_cost = np.zeros(len(close)), np.zeros(len(close))
+    closed[exits] = np.round(np.diff(total_quantity[exits], prepend=0.0), 4)
+    closed_cost[exits] = np.diff(total_cost[exits], prepend=0.0)
+    return {
+        "fills": fills,
+        "fillPrices": fill_prices,
+        # after the exit of the candle, if any
+        "quantity": quantity,
+        "cost": cost,
+        "averagePrice": np.round(
+            np.divide(cost, quantity, out=np.zeros(len(close)), where=quantity > 0), 4
+        ),
+        "closed": closed,
+        "closedCost": closed_cost,
+    }
+
+
+def run_signals(prices: np.ndarray, signals: Signals, initial_balance: float) -> dict:
+    """
+    backtest signals over the candles in one pass
+    :param prices: candles in the csv column layout (PriceDataSet.prices)
+    :param signals: entries & exits of each candle
+    :param initial_balance: balance in usd before the first candle
+    :return: the keys of Strategy.get_result() with a recorded equity, plus arrays of each candle:
+    equity, balance, margin, long/short quantity & average price, and the filled orders
+    """
+    n = len(prices)
+    if n == 0:
+        # empty date range, nothing is filled
+        return get_empty_result(initial_balance)
+    close, close_times = prices[:, 4], prices[:, 5].astype(np.int64)
+    candles = np.arange(n)
+    is_exit = get_exits(signals.exits, n).copy()
+    is_exit[-1:] = True
+    exits = np.flatnonzero(is_exit)
+    # last exit at or before each candle
+    last_exit = np.maximum.accumulate(np.where(is_exit, candles, -1))
+
+    long = get_position(get_sizes(signals.long_entries, n), close, exits, last_exit)
+    short = get_position(get_sizes(signals.short_entries, n), close, exits, last_exit)
+    # balance changes: buying longs, selling closed longs, profit of closed shorts
+    long_spent = long["fills"] * long["fillPrices"]
+    flows = -long_spent + long["closed"] * close + short["closedCost"] - short["closed"] * close
+    balance = initial_balance + np.cumsum(flows)
+    # LongPosition.increase() asserts the balance can pay for the order
+    if np.any(balance - flows - long_spent < 0):
+        raise ValueError("Balance can't pay for the long orders")
+    # shorts are sold on margin until they're closed
+    margin = short["cost"]
+    equity = balance + long["quantity"] * close + margin - short["quantity"] * close
+
+    filled_orders = get_filled_orders(
+        close_times,
+        [
+            (0, OrderSide.BUY, PositionSide.LONG, long["fills"], long["fillPrices"]),
+            (1, OrderSide.SELL, PositionSide.SHORT, short["fills"], short["fillPrices"]),
+            (2, OrderSide.SELL, PositionSide.LONG, long["closed"], close),
+            (3, OrderSide.BUY, PositionSide.SHORT, short["closed"], close),
+        ],
+    )
+    final_balance = float(balance[-1])
+    return {
+        "pnl": round(final_balance - initial_balance, 4),
+        "balance": final_balance,
+        "fills": len(filled_orders["quantity"]),
+        "candles": n,
+        "maxDrawdown": get_max_drawdown(equity),
+        "equity": equity,
+        "balances": balance,
+        "margin": margin,
+        "longQuantity": long["quantity"],
+        "shortQuantity": short["quantity"],
+        "longAveragePrice": long["averagePrice"],
+        "shortAveragePrice": short["averagePrice"],
+        "filledOrders": filled_orders,
+    }
+
+
+def get_empty_result(initial_balance: float) -> dict:
+    empty = np.zeros(0)
+    return {
+        "pnl": 0.0,
+        "balance": initial_balance,
+        "fills": 0,
+        "candles": 0,
+        "maxDrawdown": 0.0,
+        "equity": empty,
+        "balances": empty,
+        "margin": empty,
+        "longQuantity": empty,
+        "shortQuantity": empty,
+        "longAveragePrice": empty,
+        "shortAveragePrice": empty,
+        "filledOrders": {
+            "candle": np.zeros(0, dtype=np.int64),
+            "filledAt": np.zeros(0, dtype=np.int64),
+            "side": np.zeros(0, dtype=str),
+            "positionSide": np.zeros(0, dtype=str),
+            "price": empty,
+            "quantity": empty,
+        },
+    }
+
+
+def get_filled_orders(close_times: np.ndarray, kinds: list[tuple]) -> dict:
+    # columns of the filled orders in the order the event loop fills them: by candle, then entries
+    # (long first, like SignalStrategy places them) before exits
+    candles, ranks, sides, position_sides, quantities, prices = [], [], [], [], [], []
+    for rank, side, position_side, quantity, price in kinds:
+        filled = np.flatnonzero(quantity > 0)
+        candles.append(filled)
+        ranks.append(np.full(len(filled), rank))
+        sides.append(np.full(len(filled), side.value))
+        position_sides.append(np.full(len(filled), position_side.value))
+        quantities.append(quantity[filled])
+        prices.append(price[filled])
+    candles, ranks = np.concatenate(candles), np.concatenate(ranks)
+    order = np.lexsort((ranks, candles))
+    candles = candles[order]
+    return {
+        "candle": candles,
+        "filledAt": close_times[candles],
+        "side": np.concatenate(sides)[order],
+        "positionSide": np.concatenate(position_sides)[order],
+        "price": np.concatenate(prices)[order],
+        "quantity": np.concatenate(quantities)[order],
+    }
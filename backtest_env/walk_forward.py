@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from backtest_env.batch import run_batch
+from backtest_env.constants import DATA_DIR
+from backtest_env.sweep import (
+    METRICS,
+    expand_space,
+    get_time_range,
+    run_combinations,
+    run_halving,
+    sort_rows,
+)
+from backtest_env.utils import (
+    DATETIME_FORMAT,
+    convert_datetime_to_nanosecond,
+    convert_nanosecond_to_datetime,
+    get_max_drawdown,
+    get_timeframe_length,
+)
+
+# Walk-forward optimization: the history is split into rolling windows of <train_days> in-sample
+# days followed by <test_days> out-of-sample days, the next window starts <step_days> later.
+# The params are optimized on each in-sample part and the best ones are backtested on the
+# following out-of-sample part, the out-of-sample equity curves are stitched into one curve.
+# Usage: python -m backtest_env.walk_forward wf.json [-o result.json], wf.json has the keys of
+# run_walk_forward(): {"config": {...}, "space": {...}, "train_days": 30, "test_days": 7}
+
+ONE_DAY = 86_400_000
+
+
+def split_windows(
+    config: dict, train_days: int, test_days: int, step_days: int, data_dir: str
+) -> list[dict]:
+    # windows are time ranges, like startTime & endTime of Args, the last test part may be shorter.
+    # endTime includes the candle opened at that time, so a part ends one candle before the next
+    # one starts: no candle is in two parts
+    _, last = get_time_range(config, data_dir)
+    tf = get_timeframe_length(config["timeframe"])
+    start = convert_datetime_to_nanosecond(config["startTime"])
+    windows = []
+    while start + train_days * ONE_DAY <= last:
+        test_start = start + train_days * ONE_DAY
+        test_end = min(test_start + test_days * ONE_DAY - tf, last)
+        windows.append(
+            {
+                "trainStart": convert_nanosecond_to_datetime(start, DATETIME_FORMAT),
+                "trainEnd": convert_nanosecond_to_datetime(test_start - tf, DATETIME_FORMAT),
+                "testStart": convert_nanosecond_to_datetime(test_start, DATETIME_FORMAT),
+                "testEnd": convert_nanosecond_to_datetime(test_end, DATETIME_FORMAT),
+            }
+        )
+        start += step_days * ONE_DAY
+    return windows
+
+
+def optimize_windows(
+    config: dict,
+    windows: list[dict],
+    combinations: list[dict],
+    metric: str,
+    halving: dict | None,
+    max_workers: int | None,
+    data_dir: str,
+) -> list[dict]:
+    # return the best row of each window's in-sample sweep
+    if halving is not None:
+        # rungs of a halving depend on each other, so windows run one after the other
+        best = []
+        halving = {**halving, "metric": metric}
+        for window in windows:
+            train_config = {
+                **config,
+                "startTime": window["trainStart"],
+                "endTime": window["trainEnd"],
+            }
+            rows = run_halving(
+                train_config, combinations, **halving, max_workers=max_workers, data_dir=data_dir
+            )
+            best.append(rows[0])
+        return best
+
+    # in-sample sweeps are independent: all (window, params) run in a single batch
+    window_combinations = [
+        {**params, "startTime": window["trainStart"], "endTime": window["trainEnd"]}
+        for window in windows
+        for params in combinations
+    ]
+    rows = run_combinations(config, window_combinations, max_workers, data_dir)
+    n = len(combinations)
+    return [sort_rows(rows[i * n : (i + 1) * n], metric)[0] for i in range(len(windows))]
+
+
+def stitch_equity(curves: list[list[float]], initial_balance: float) -> np.ndarray:
+    # every out-of-sample backtest starts with the initial balance, each curve is shifted so it
+    # starts where the previous one ended
+    stitched = []
+    offset = 0.0
+    for curve in curves:
+        if not curve:
+            continue
+        stitched.append(np.asarray(curve) + offset)
+        offset += curve[-1] - initial_balance
+    return np.concatenate(stitched) if stitched else np.zeros(0)
+
+
+def run_walk_forward(
+    config: dict,
+    space: dict,
+    train_days: int,
+    test_days: int,
+    step_days: int | None = None,
+    metric: str = "pnl",
+    method: str = "grid",
+    samples: int = 100,
+    seed: int = 0,
+    halving: dict | None = None,
+    max_workers: int | None = None,
+    data_dir: str = DATA_DIR,
+) -> dict:
+    windows = split_windows(config, train_days, test_days, step_days or test_days, data_dir)
+    if not windows:
+        raise ValueError(f"Not enough data for a window of {train_days} + {test_days} days")
+    combinations = expand_space(config["strategy"], space, method, samples, seed)
+    best = optimize_windows(config, windows, combinations, metric, halving, max_workers, data_dir)
+
+    # out-of-sample backtests of the windows are independent too
+    test_configs = [
+        {
+            **config,
+            **{field: row[field] for field in combinations[0]},
+            "startTime": window["testStart"],
+            "endTime": window["testEnd"],
+        }
+        for window, row in zip(windows, best, strict=True)
+    ]
+    results = [None] * len(test_configs)
+    for result in run_batch(test_configs, max_workers, data_dir, with_equity=True):
+        results[result["index"]] = result
+
+    for window, row, result in zip(windows, best, results, strict=True):
+        window["params"] = {field: row[field] for field in combinations[0]}
+        window["train"] = {metric: row.get(metric) for metric in METRICS if metric in row}
+        window["test"] = {metric: result.get(metric) for metric in METRICS if metric in result}
+    equity = stitch_equity(
+        [result.get("equity", []) for result in results], config["initialBalance"]
+    )
+    return {
+        "windows": windows,
+        "pnl": round(float(equity[-1] - config["initialBalance"]), 4) if len(equity) else 0.0,
+        "maxDrawdown": get_max_drawdown(equity),
+        "equity": equity.tolist(),
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Walk-forward optimization of a strategy")
+    parser.add_argument("walk_forward", help="JSON file with the kwargs of run_walk_forward()")
+    parser.add_argument("-o", "--output", help="JSON file of the result, stdout by default")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    args = parser.parse_args(argv)
+
+    with open(args.walk_forward, "r") as f:
+        kwargs = json.load(f)
+    result = run_walk_forward(**kwargs, max_workers=args.workers, data_dir=args.data_dir)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f)
+    else:
+        print(json.dumps({key: value for key, value in result.items() if key != "equity"}))
+
+
+if __name__ == "__main__":
+    main()
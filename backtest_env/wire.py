@@ -0,0 +1,201 @@
+import struct
+
+import numpy as np
+
+from backtest_env.base.order import OrderType
+from backtest_env.base.side import OrderSide, PositionSide
+
+# Compact binary encoding of candle & order batches sent to front-end (Args.binaryFrames).
+# Most bytes of a JSON batch are repeated keys, here every field is stored as a column instead:
+# - header: magic "BW", version, kind, number of rows (little-endian everywhere)
+# - integer columns: first value (int64) then deltas in the narrowest int type that fits them
+# - decimal columns: number of decimals d, then round(value * 10^d) as an integer column.
+#   d is the smallest one that gives back the exact same floats, columns that need more than
+#   8 decimals or whose scaled values don't fit in int64 are stored as raw float64 (d = 255)
+# - enums are uint8 codes, 255 for values outside of the code table (orders without a type like
+#   TrailingStop), decoded as "". Order ids (16 hex chars) are 8 raw bytes
+
+MAGIC = b"BW"
+VERSION = 1
+CANDLES = 1
+ORDERS = 2
+
+INT_TYPES = [np.dtype("<i1"), np.dtype("<i2"), np.dtype("<i4"), np.dtype("<i8")]
+MAX_DECIMALS = 8
+RAW_FLOAT = 255
+# scaled decimals must be below it to fit in int64
+INT64_LIMIT = 2.0**63
+ORDER_TYPES = list(OrderType)
+ORDER_SIDES = list(OrderSide)
+POSITION_SIDES = list(PositionSide)
+ID_SIZE = 8
+# code of values outside of the code table
+UNKNOWN = 255
+
+
+def encode_ints(values: np.ndarray) -> bytes:
+    values = values.astype(np.int64)
+    if len(values) == 0:
+        return b""
+    deltas = np.diff(values)
+    code = 0
+    if len(deltas):
+        lo, hi = deltas.min(), deltas.max()
+        while not (np.iinfo(INT_TYPES[code]).min <= lo and hi <= np.iinfo(INT_TYPES[code]).max):
+            code += 1
+    return struct.pack("<qB", values[0], code) + deltas.astype(INT_TYPES[code]).tobytes()
+
+
+def decode_ints(buffer: bytes, offset: int, n: int) -> tuple[np.ndarray, int]:
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), offset
+    first, code = struct.unpack_from("<qB", buffer, offset)
+    offset += 9
+    dtype = INT_TYPES[code]
+    deltas = np.frombuffer(buffer, dtype=dtype, count=n - 1, offset=offset)
+    values = np.empty(n, dtype=np.int64)
+    values[0] = first
+    np.cumsum(deltas, out=values[1:])
+    values[1:] += first
+    return values, offset + (n - 1) * dtype.itemsize
+
+
+def get_decimals(values: np.ndarray) -> int:
+    for decimals in range(MAX_DECIMALS + 1):
+        scale = 10**decimals
+        if np.array_equal(np.round(values * scale) / scale, values):
+            return decimals
+    return RAW_FLOAT
+
+
+def encode_decimals(values: np.ndarray) -> bytes:
+    values = values.astype(np.float64)
+    decimals = get_decimals(values)
+    if decimals != RAW_FLOAT:
+        ticks = np.round(values * 10**decimals)
+        # casting to int64 would silently wrap large (or infinite) values
+        if np.all(np.abs(ticks) < INT64_LIMIT):
+            return struct.pack("<B", decimals) + encode_ints(ticks)
+    return struct.pack("<B", RAW_FLOAT) + values.astype("<f8").tobytes()
+
+
+def decode_decimals(buffer: bytes, offset: int, n: int) -> tuple[np.ndarray, int]:
+    (decimals,) = struct.unpack_from("<B", buffer, offset)
+    offset += 1
+    if decimals == RAW_FLOAT:
+        values = np.frombuffer(buffer, dtype="<f8", count=n, offset=offset)
+        return values, offset + 8 * n
+    ticks, offset = decode_ints(buffer, offset, n)
+    return ticks / 10**decimals, offset
+
+
+def encode_header(kind: int, n: int) -> bytes:
+    return MAGIC + struct.pack("<BBI", VERSION, kind, n)
+
+
+def decode_header(buffer: bytes, kind: int) -> tuple[int, int]:
+    if buffer[:2] != MAGIC:
+        raise ValueError("Not a binary frame")
+    version, encoded_kind, n = struct.unpack_from("<BBI", buffer, 2)
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary frame version: {version}")
+    if encoded_kind != kind:
+        raise ValueError(f"Expected a binary frame of kind {kind}, got {encoded_kind}")
+    return n, 8
+
+
+def encode_candles(candles: list[dict]) -> bytes:
+    # candles are Price.json() dicts
+    columns = np.array(
+        [(c["time"], c["open"], c["high"], c["low"], c["close"]) for c in candles], dtype=np.float64
+    ).reshape(-1, 5)
+    chunks = [encode_header(CANDLES, len(candles)), encode_ints(columns[:, 0])]
+    chunks.extend(encode_decimals(columns[:, i]) for i in range(1, 5))
+    return b"".join(chunks)
+
+
+def decode_candles(buffer: bytes) -> list[dict]:
+    n, offset = decode_header(buffer, CANDLES)
+    times, offset = decode_ints(buffer, offset, n)
+    prices = []
+    for _ in range(4):
+        column, offset = decode_decimals(buffer, offset, n)
+        prices.append(column.tolist())
+    return [
+        {"open": o, "high": h, "low": lo, "close": c, "time": t}
+        for t, o, h, lo, c in zip(times.tolist(), *prices, strict=True)
+    ]
+
+
+def encode_codes(values: list, codes: list) -> bytes:
+    lookup = {value: code for code, value in enumerate(codes)}
+    return bytes(lookup.get(value, UNKNOWN) for value in values)
+
+
+def encode_orders(orders: list[dict]) -> bytes:
+    # orders are Order.json() dicts, used by new_orders & fills
+    symbols = list(dict.fromkeys(order["symbol"] for order in orders))
+    chunks = [encode_header(ORDERS, len(orders)), struct.pack("<B", len(symbols))]
+    for symbol in symbols:
+        encoded = symbol.encode()
+        chunks.append(struct.pack("<B", len(encoded)) + encoded)
+    chunks += [
+        b"".join(bytes.fromhex(order["id"]) for order in orders),
+        encode_codes([order["type"] for order in orders], ORDER_TYPES),
+        encode_codes([order["side"] for order in orders], ORDER_SIDES),
+        encode_codes([order["positionSide"] for order in orders], POSITION_SIDES),
+        encode_codes([order["symbol"] for order in orders], symbols),
+        encode_decimals(np.array([order["quantity"] for order in orders], dtype=np.float64)),
+        encode_decimals(np.array([order["price"] for order in orders], dtype=np.float64)),
+        encode_ints(np.array([order["createdAt"] for order in orders], dtype=np.int64)),
+        encode_ints(np.array([order["filledAt"] for order in orders], dtype=np.int64)),
+    ]
+    return b"".join(chunks)
+
+
+def decode_codes(buffer: bytes, offset: int, n: int, codes: list) -> tuple[list, int]:
+    values = [codes[code] if code != UNKNOWN else "" for code in buffer[offset : offset + n]]
+    return values, offset + n
+
+
+def decode_orders(buffer: bytes) -> list[dict]:
+    n, offset = decode_header(buffer, ORDERS)
+    (num_symbols,) = struct.unpack_from("<B", buffer, offset)
+    offset += 1
+    symbols = []
+    for _ in range(num_symbols):
+        (size,) = struct.unpack_from("<B", buffer, offset)
+        symbols.append(buffer[offset + 1 : offset + 1 + size].decode())
+        offset += 1 + size
+    ids = [buffer[offset + i * ID_SIZE : offset + (i + 1) * ID_SIZE].hex() for i in range(n)]
+    offset += n * ID_SIZE
+    types, offset = decode_codes(buffer, offset, n, ORDER_TYPES)
+    sides, offset = decode_codes(buffer, offset, n, ORDER_SIDES)
+    position_sides, offset = decode_codes(buffer, offset, n, POSITION_SIDES)
+    order_symbols, offset = decode_codes(buffer, offset, n, symbols)
+    quantities, offset = decode_decimals(buffer, offset, n)
+    prices, offset = decode_decimals(buffer, offset, n)
+    created_at, offset = decode_ints(buffer, offset, n)
+    filled_at, offset = decode_ints(buffer, offset, n)
+    return [
+        {
+            "type": types[i],
+            "side": sides[i],
+            "quantity": quantities[i].item(),
+            "symbol": order_symbols[i],
+            "price": prices[i].item(),
+            "positionSide": position_sides[i],
+            "id": ids[i],
+            "createdAt": created_at[i].item(),
+            "filledAt": filled_at[i].item(),
+        }
+        for i in range(n)
+    ]
+
+
+# frame keys of FrameEmitter that can be sent in binary
+STREAM_ENCODERS = {
+    "new_candle": encode_candles,
+    "new_orders": encode_orders,
+    "fills": encode_orders,
+}
@@ -0,0 +1,164 @@
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import Connection
+
+from backtest_env import price_store
+from backtest_env.base.strategy import Strategy
+from backtest_env.logger import logger
+from backtest_env.price_store import PriceHandle
+from backtest_env.strategies import STRATEGIES
+
+# imported once by the fork server, every worker forked from it starts with these modules loaded:
+# numpy, socketio, pydantic, configs.json and all strategies
+PRELOAD_MODULES = ["backtest_env.worker_pool"]
+
+
+def run_backtest(args: dict, handle: PriceHandle = None):
+    if handle:
+        price_store.attach(handle)
+    try:
+        strategy: Strategy = STRATEGIES[args["strategy"]].from_cfg(args)
+        strategy.run(args["allowLiveUpdates"])
+    finally:
+        # a worker runs many jobs, the candles of a finished one shouldn't stay mapped
+        if handle:
+            price_store.detach(handle.symbol, handle.tf)
+
+
+def worker_loop(conn: Connection, target: callable, max_jobs: int):
+    # runs in the worker process: receive a job, run it, report it's done
+    # the worker exits after <max_jobs> jobs so leaks of a job don't pile up, the pool respawns it
+    for _ in range(max_jobs):
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        job_id, args = job
+        try:
+            target(*args)
+        except Exception:
+            logger.exception(f"Job {job_id} failed")
+        conn.send(job_id)
+
+
+class Worker:
+    def __init__(self, process: multiprocessing.Process, conn: Connection, max_jobs: int):
+        self.process = process
+        self.conn = conn
+        self.job_id: str | None = None
+        # jobs sent to the worker, it exits after <max_jobs> jobs and a job sent to it after that
+        # would be lost
+        self.jobs = 0
+        self.max_jobs = max_jobs
+
+    def is_idle(self) -> bool:
+        return self.job_id is None and self.jobs < self.max_jobs and self.process.is_alive()
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Pre-forked backtest processes, so a job doesn't pay for process start-up & imports.
+    Jobs are queued with submit() and sent to idle workers over a pipe. A running job is cancelled
+    by killing its worker, which is replaced right away. poll() must be called periodically by
+    the owner (app.py runs it in an asyncio task): it collects finished jobs, respawns exited
+    workers and dispatches queued jobs
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        max_jobs_per_worker: int = 100,
+        target: callable = run_backtest,
+        on_finished: callable = None,
+    ):
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.target = target
+        # called with the job id when a job finishes by itself, cancelled jobs aren't reported
+        self.on_finished = on_finished
+        self.context = multiprocessing.get_context("forkserver")
+        self.context.set_forkserver_preload(PRELOAD_MODULES)
+        self.workers: list[Worker] = []
+        self.queue: deque[tuple[str, tuple]] = deque()
+
+    def start(self):
+        self.workers = [self.spawn() for _ in range(self.size)]
+
+    def spawn(self) -> Worker:
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=worker_loop,
+            args=(child_conn, self.target, self.max_jobs_per_worker),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return Worker(process, parent_conn, self.max_jobs_per_worker)
+
+    def submit(self, job_id: str, *args):
+        self.queue.append((job_id, args))
+        self.dispatch()
+
+    def cancel(self, job_id: str) -> bool:
+        for i, (queued_id, _) in enumerate(self.queue):
+            if queued_id == job_id:
+                del self.queue[i]
+                return True
+        for i, worker in enumerate(self.workers):
+            if worker.job_id == job_id:
+                worker.stop()
+                self.workers[i] = self.spawn()
+                self.dispatch()
+                return True
+        return False
+
+    def dispatch(self):
+        for worker in self.workers:
+            if not self.queue:
+                return
+            if worker.is_idle():
+                job_id, args = self.queue.popleft()
+                worker.conn.send((job_id, args))
+                worker.job_id = job_id
+                worker.jobs += 1
+
+    def poll(self):
+        for i, worker in enumerate(self.workers):
+            if worker.conn.poll():
+                try:
+                    job_id = worker.conn.recv()
+                except (EOFError, ConnectionResetError):
+                    # the worker exited
+                    job_id = None
+                if job_id is not None:
+                    worker.job_id = None
+                    if self.on_finished:
+                        self.on_finished(job_id)
+            if not worker.process.is_alive():
+                # recycled after max jobs, or crashed: its job (if any) is lost
+                if worker.job_id is not None:
+                    logger.warning(f"Worker of job {worker.job_id} exited unexpectedly")
+                    if self.on_finished:
+                        self.on_finished(worker.job_id)
+                worker.stop()
+                self.workers[i] = self.spawn()
+        self.dispatch()
+
+    def is_running(self, job_id: str) -> bool:
+        return any(worker.job_id == job_id for worker in self.workers)
+
+    def close(self):
+        self.queue.clear()
+        for worker in self.workers:
+            if worker.is_idle():
+                worker.conn.send(None)
+                worker.process.join(timeout=1)
+            worker.stop()
+        self.workers = []
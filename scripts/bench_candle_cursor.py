@@ -0,0 +1,58 @@
+import logging
+
+from backtest_env import price_store
+from backtest_env.logger import logger
+from backtest_env.price import Price, PriceDataSet
+from backtest_env.strategies import STRATEGIES
+from scripts.bench_utils import generate_prices, timeit
+
+# 30 days of 1m candles
+NUM_CANDLES = 43_200
+ARGS = {
+    "initialBalance": 10000.0,
+    "symbol": "BENCH",
+    "timeframe": "1m",
+    "startTime": "2024-01-01",
+    "endTime": None,
+    "allowLiveUpdates": False,
+    "gridSize": 50,
+    "orderSize": 100.0,
+    "interval": 4,
+    "candleCacheSize": 5,
+}
+
+
+class AllocatingPriceDataSet(PriceDataSet):
+    # the old access path: a new Price is built from a numpy row on every access
+    def get_current_price(self) -> Price:
+        return Price(*self.prices[self.idx])
+
+    def get_open_price(self):
+        return self.get_current_price().open
+
+    def get_close_price(self):
+        return self.get_current_price().close
+
+    def get_close_time(self):
+        return self.get_current_price().close_time
+
+
+def run(name: str, legacy: bool):
+    strategy = STRATEGIES[name].from_cfg({**ARGS, "strategy": name})
+    if legacy:
+        strategy.data.__class__ = AllocatingPriceDataSet
+    strategy.run()
+
+
+logger.setLevel(logging.WARNING)
+price_store.register("BENCH", "1m", generate_prices(NUM_CANDLES))
+
+print(f"candles: {NUM_CANDLES}")
+for strategy_name in ["Baseline", "TrendFollower"]:
+    before = timeit(lambda name=strategy_name: run(name, legacy=True), repeat=3)
+    after = timeit(lambda name=strategy_name: run(name, legacy=False), repeat=3)
+    print(
+        f"{strategy_name:>13}: "
+        f"before {NUM_CANDLES / before:10.0f} candles/s, "
+        f"after {NUM_CANDLES / after:10.0f} candles/s ({before / after:.2f}x)"
+    )
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import time
+
+from backtest_env.batch import init_worker, run_config
+from backtest_env.episodes import run_episodes
+from backtest_env.price_store import SharedPriceStore
+from scripts.bench_utils import generate_prices, write_csv
+
+# 120 days of 1m candles
+NUM_CANDLES = 172_800
+CONFIG = {
+    "initialBalance": 10000.0,
+    "symbol": "BENCH",
+    "timeframe": "1m",
+    "startTime": "2024-01-01",
+    "endTime": None,
+    "strategy": "TrendFollower",
+    "allowLiveUpdates": False,
+    "gridSize": 20,
+    "orderSize": 100.0,
+    "interval": 4,
+    "candleCacheSize": 5,
+}
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_csv(os.path.join(data_dir, "BENCH_1m.csv"), generate_prices(NUM_CANDLES))
+        store = SharedPriceStore(data_dir)
+        init_worker([store.acquire("BENCH", "1m")])
+
+        start = time.perf_counter()
+        sequential = run_config(0, CONFIG)
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel = run_episodes(CONFIG, data_dir=data_dir)
+        parallel_time = time.perf_counter() - start
+
+        print(f"cpus: {os.cpu_count()}, candles: {NUM_CANDLES}")
+        print(f"sequential: {sequential_time:8.2f} s, pnl {sequential['pnl']}")
+        print(f"episodes:   {parallel_time:8.2f} s, pnl {parallel['pnl']}")
+        print(f"speedup: {sequential_time / parallel_time:.2f}x")
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import time
+
+from backtest_env.batch import init_worker, run_config
+from backtest_env.price_store import SharedPriceStore
+from scripts.bench_utils import generate_prices, write_csv
+
+# 120 days of 1m candles
+NUM_CANDLES = 172_800
+CONFIG = {
+    "initialBalance": 10000.0,
+    "symbol": "BENCH",
+    "timeframe": "1m",
+    "startTime": "2024-01-01",
+    "endTime": None,
+    "strategy": "TrendFollower",
+    "allowLiveUpdates": False,
+    "gridSize": 20,
+    "orderSize": 100.0,
+    "interval": 4,
+    "candleCacheSize": 5,
+}
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_csv(os.path.join(data_dir, "BENCH_1m.csv"), generate_prices(NUM_CANDLES))
+        store = SharedPriceStore(data_dir)
+        init_worker([store.acquire("BENCH", "1m")])
+
+        print(f"candles: {NUM_CANDLES}")
+        for strategy in ("TrendFollower", "Baseline"):
+            results = {}
+            for fast_forward in (False, True):
+                config = {**CONFIG, "strategy": strategy, "fastForward": fast_forward}
+                start = time.perf_counter()
+                results[fast_forward] = (run_config(0, config), time.perf_counter() - start)
+            (full, full_time), (fast, fast_time) = results[False], results[True]
+            print(
+                f"{strategy:14} every candle: {full_time:6.2f} s, pnl {full['pnl']}"
+                f" | fast-forward: {fast_time:6.2f} s, pnl {fast['pnl']}"
+                f" | speedup: {full_time / fast_time:.2f}x"
+            )
+        store.close()
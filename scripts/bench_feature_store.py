@@ -0,0 +1,41 @@
+import tempfile
+import time
+
+from backtest_env import feature_store
+from backtest_env.feature_store import FEATURES, FeatureStore
+from scripts.bench_utils import generate_prices
+
+# 1 year of 1m candles
+NUM_CANDLES = 525_600
+# (name, params) of the features used by every run of a sweep
+SWEEP_FEATURES = [
+    ("ema", {"period": 50}),
+    ("atr", {"period": 14}),
+    ("rolling_high", {"period": 1440}),
+    ("daily_change", {"period": 5}),
+]
+RUNS = 20
+
+if __name__ == "__main__":
+    prices = generate_prices(NUM_CANDLES)
+    with tempfile.TemporaryDirectory() as directory:
+        store = FeatureStore(directory)
+
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            for name, params in SWEEP_FEATURES:
+                FEATURES[name](prices, **params)
+        computed = (time.perf_counter() - start) / RUNS
+
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            # every process of a sweep hashes the candles once
+            feature_store.content_hashes.clear()
+            for name, params in SWEEP_FEATURES:
+                store.get(prices, name, params)
+        cached = (time.perf_counter() - start) / RUNS
+
+    print(f"candles: {NUM_CANDLES}, features: {len(SWEEP_FEATURES)}")
+    print(f"computed per run: {computed * 1000:8.1f} ms")
+    print(f"feature store:    {cached * 1000:8.1f} ms (first run computes & saves them)")
+    print(f"speedup: {computed / cached:.1f}x")
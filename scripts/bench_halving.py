@@ -0,0 +1,50 @@
+import os
+import tempfile
+import time
+
+from backtest_env.sweep import run_sweep
+from scripts.bench_utils import generate_prices, write_csv
+
+# 90 days of 5m candles
+NUM_CANDLES = 25_920
+TOP_K = 5
+CONFIG = {
+    "initialBalance": 10000.0,
+    "symbol": "BENCH",
+    "timeframe": "5m",
+    "startTime": "2024-01-01",
+    "endTime": None,
+    "strategy": "TrendFollower",
+    "allowLiveUpdates": False,
+    "gridSize": 5,
+    "orderSize": 100.0,
+    "interval": 4,
+    "candleCacheSize": 5,
+}
+SPACE = {"Grid Size": [2, 5, 10], "Interval": [2, 4, 8], "Candle Cache Size": [2, 5, 10]}
+
+
+def get_params(row: dict) -> tuple:
+    return row["gridSize"], row["interval"], row["candleCacheSize"]
+
+
+with tempfile.TemporaryDirectory() as data_dir:
+    write_csv(os.path.join(data_dir, "BENCH_5m.csv"), generate_prices(NUM_CANDLES, tf=300_000))
+
+    start = time.perf_counter()
+    exhaustive = run_sweep(CONFIG, SPACE, data_dir=data_dir)
+    exhaustive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    halving = run_sweep(CONFIG, SPACE, halving={"eta": 3, "rungs": 3}, data_dir=data_dir)
+    halving_time = time.perf_counter() - start
+
+    ranks = [get_params(row) for row in exhaustive]
+    top_exhaustive = set(ranks[:TOP_K])
+    top_halving = {get_params(row) for row in halving[:TOP_K]}
+    print(f"combinations: {len(exhaustive)}")
+    print(f"exhaustive sweep:   {exhaustive_time:8.2f} s, best {get_params(exhaustive[0])}")
+    print(f"successive halving: {halving_time:8.2f} s, best {get_params(halving[0])}")
+    rank = ranks.index(get_params(halving[0])) + 1
+    print(f"rank of the halving's best in the exhaustive sweep: {rank}")
+    print(f"top {TOP_K} overlap: {len(top_exhaustive & top_halving)}/{TOP_K}")
@@ -0,0 +1,22 @@
+import os
+import tempfile
+
+from backtest_env.utils import build_cache, get_cache_name, read_price_data
+from scripts.bench_utils import generate_prices, remove_files, timeit, write_csv
+
+# one year of 1m candles
+NUM_CANDLES = 525_600
+
+with tempfile.TemporaryDirectory() as data_dir:
+    file_name = os.path.join(data_dir, "BENCH_1m.csv")
+    cache_name = get_cache_name(file_name)
+    write_csv(file_name, generate_prices(NUM_CANDLES))
+
+    # cold: the csv is parsed and converted to .npy
+    cold = timeit(lambda: (remove_files(cache_name), build_cache(file_name, cache_name)))
+    # warm: the .npy cache is memory-mapped, read every row to include the page-in cost
+    warm = timeit(lambda: read_price_data(file_name)[:, 4].sum(), repeat=5)
+
+    print(f"candles: {NUM_CANDLES}")
+    print(f"cold csv load:   {cold * 1000:10.2f} ms")
+    print(f"warm binary load: {warm * 1000:9.2f} ms ({cold / warm:.0f}x faster)")
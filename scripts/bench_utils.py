@@ -0,0 +1,42 @@
+import os
+import time
+
+import numpy as np
+
+ONE_MINUTE = 60_000
+HEADER = "open_time,open,high,low,close,close_time"
+
+
+def generate_prices(
+    n: int, tf: int = ONE_MINUTE, start: int = 1704067200000, seed: int = 1993
+) -> np.ndarray:
+    # random walk candles in the same column layout as our csv files:
+    # open_time, open, high, low, close, close_time
+    # the tests use the same candles
+    rng = np.random.default_rng(seed)
+    close = np.round(100 * np.exp(np.cumsum(rng.normal(0, 0.002, n))), 4)
+    open_price = np.concatenate(([100.0], close[:-1]))
+    high = np.round(np.maximum(open_price, close) * (1 + rng.uniform(0, 0.001, n)), 4)
+    low = np.round(np.minimum(open_price, close) * (1 - rng.uniform(0, 0.001, n)), 4)
+    open_time = start + np.arange(n, dtype=np.float64) * tf
+    return np.column_stack((open_time, open_price, high, low, close, open_time + tf - 1))
+
+
+def write_csv(file_name: str, prices: np.ndarray):
+    np.savetxt(file_name, prices, delimiter=",", header=HEADER, comments="", fmt="%.4f")
+
+
+def remove_files(*file_names: str):
+    for file_name in file_names:
+        if os.path.exists(file_name):
+            os.remove(file_name)
+
+
+def timeit(fn, repeat: int = 1) -> float:
+    # return the best wall time of <repeat> runs, in seconds
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
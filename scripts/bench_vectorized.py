@@ -0,0 +1,46 @@
+import time
+
+import numpy as np
+
+from backtest_env import price_store
+from backtest_env.base.signal_strategy import SignalStrategy
+from backtest_env.indicators import rolling_mean
+from backtest_env.vectorized import Signals
+from scripts.bench_utils import generate_prices
+
+# 1 year of 1m candles
+NUM_CANDLES = 525_600
+CONFIG = {
+    "initialBalance": 10000.0,
+    "symbol": "BENCH",
+    "timeframe": "1m",
+    "startTime": "2024-01-01",
+    "endTime": None,
+    "strategy": "MovingAverageCross",
+    "allowLiveUpdates": False,
+}
+
+
+class MovingAverageCross(SignalStrategy):
+    # reverse the position when the fast average crosses the slow one
+    def get_signals(self, prices: np.ndarray) -> Signals:
+        above = rolling_mean(prices[:, 4], 20) > rolling_mean(prices[:, 4], 200)
+        cross = np.concatenate(([False], above[1:] != above[:-1]))
+        return Signals(cross & above, cross & ~above, cross)
+
+
+if __name__ == "__main__":
+    price_store.register("BENCH", "1m", generate_prices(NUM_CANDLES))
+    timings = {}
+    for vectorized in (False, True):
+        # signals are computed by the constructor, only the engines are timed
+        strategy = MovingAverageCross.from_cfg({**CONFIG, "vectorized": vectorized})
+        start = time.perf_counter()
+        strategy.run()
+        timings[vectorized] = (time.perf_counter() - start, strategy.get_result())
+
+    (event_time, event_result), (vectorized_time, vectorized_result) = timings.values()
+    print(f"candles: {NUM_CANDLES}, fills: {event_result['fills']}")
+    print(f"event loop: {event_time:8.3f} s, pnl {event_result['pnl']}")
+    print(f"vectorized: {vectorized_time:8.3f} s, pnl {vectorized_result['pnl']}")
+    print(f"speedup: {event_time / vectorized_time:.0f}x")
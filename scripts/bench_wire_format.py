@@ -0,0 +1,37 @@
+import json
+
+from backtest_env.base.side import OrderSide, PositionSide
+from backtest_env.orders.limit import LimitOrder
+from backtest_env.price import Price
+from backtest_env.wire import encode_candles, encode_orders
+from scripts.bench_utils import generate_prices, timeit
+
+# one day of 1m candles, the order count is a typical grid strategy day
+NUM_CANDLES = 1440
+NUM_ORDERS = 1000
+
+candles = [Price(*row).json() for row in generate_prices(NUM_CANDLES)]
+orders = [
+    LimitOrder(
+        OrderSide.BUY if i % 2 else OrderSide.SELL,
+        candles[i % NUM_CANDLES]["close"],
+        "BTCUSDT",
+        0.01,
+        PositionSide.LONG if i % 2 else PositionSide.SHORT,
+        1704067200000 + i * 60_000,
+    ).json()
+    for i in range(NUM_ORDERS)
+]
+
+print(f"{'payload':<10}{'format':<8}{'bytes/item':>12}{'encode us/item':>16}")
+for name, items, encoder in [
+    ("candles", candles, encode_candles),
+    ("orders", orders, encode_orders),
+]:
+    for fmt, encode in [
+        ("json", lambda items=items: json.dumps(items).encode()),
+        ("binary", lambda items=items, encoder=encoder: encoder(items)),
+    ]:
+        size = len(encode()) / len(items)
+        elapsed = timeit(encode, repeat=20) / len(items) * 1e6
+        print(f"{name:<10}{fmt:<8}{size:>12.1f}{elapsed:>16.2f}")
@@ -0,0 +1,70 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+
+from backtest_env.logger import logger
+from backtest_env.price_store import PriceHandle, SharedPriceStore
+from backtest_env.worker_pool import WorkerPool, run_backtest
+from scripts.bench_utils import generate_prices, write_csv
+
+# a job of a few candles, its duration is dominated by the time-to-first-candle
+NUM_CANDLES = 3
+NUM_JOBS = 20
+ARGS = {
+    "initialBalance": 10000.0,
+    "symbol": "BENCH",
+    "timeframe": "1m",
+    "startTime": "2024-01-01",
+    "endTime": None,
+    "strategy": "Baseline",
+    "allowLiveUpdates": False,
+}
+
+
+def quiet_backtest(args: dict, handle: PriceHandle):
+    logger.setLevel(logging.WARNING)
+    run_backtest(args, handle)
+
+
+def bench_process_per_job(method: str, handle: PriceHandle) -> float:
+    # the old app.backtest: a new process for each job
+    context = multiprocessing.get_context(method)
+    start = time.perf_counter()
+    for _ in range(NUM_JOBS):
+        process = context.Process(target=quiet_backtest, args=(ARGS, handle))
+        process.start()
+        process.join()
+    return (time.perf_counter() - start) / NUM_JOBS
+
+
+def bench_worker_pool(handle: PriceHandle) -> float:
+    finished = []
+    pool = WorkerPool(size=1, target=quiet_backtest, on_finished=finished.append)
+    pool.start()
+    # first job waits for the fork server & worker to start, like the server does at startup
+    pool.submit("warm-up", ARGS, handle)
+    while not finished:
+        pool.poll()
+    start = time.perf_counter()
+    for i in range(NUM_JOBS):
+        pool.submit(f"job-{i}", ARGS, handle)
+        while len(finished) < i + 2:
+            pool.poll()
+    elapsed = (time.perf_counter() - start) / NUM_JOBS
+    pool.close()
+    return elapsed
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_csv(os.path.join(data_dir, "BENCH_1m.csv"), generate_prices(NUM_CANDLES))
+        store = SharedPriceStore(data_dir)
+        handle = store.acquire("BENCH", "1m")
+
+        print(f"{'mode':<24}{'ms/job':>10}")
+        for method in ["spawn", "fork"]:
+            elapsed = bench_process_per_job(method, handle)
+            print(f"{'process per job (' + method + ')':<24}{elapsed * 1000:>10.2f}")
+        print(f"{'worker pool':<24}{bench_worker_pool(handle) * 1000:>10.2f}")
@@ -0,0 +1,12 @@
+import pytest
+
+from backtest_env import feature_store
+
+
+@pytest.fixture(autouse=True)
+def feature_dir(tmp_path):
+    # strategies may add features, keep their files out of data/
+    default = feature_store.get_store()
+    feature_store.configure(str(tmp_path / "features"))
+    yield
+    feature_store.store = default
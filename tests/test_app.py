@@ -0,0 +1,85 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+from fastapi import HTTPException
+
+from backtest_env import app
+from backtest_env.dto import SweepRequest
+from backtest_env.scheduler import JobScheduler
+
+DATA = {"symbol": "BTCUSDT", "timeframe": "1m"}
+
+
+class TestBacktestEvent:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.prices = Mock()
+        self.prices.acquire.side_effect = lambda symbol, tf: Mock(name=f"handle-{symbol}")
+        self.pool = Mock()
+        monkeypatch.setattr(app, "shared_prices", self.prices)
+        monkeypatch.setattr(app, "scheduler", JobScheduler(self.pool, max_concurrency=2))
+        monkeypatch.setattr(app, "price_handles", {})
+        monkeypatch.setattr(app, "clients", set())
+        app.connect("sid", {}, None)
+
+    def released(self) -> list:
+        return [call.args[0] for call in self.prices.release.call_args_list]
+
+    def test_disconnect_while_prices_are_loading(self):
+        # the client leaves before the handle is acquired, nothing can cancel the backtest later
+        def acquire(symbol: str, tf: str):
+            app.disconnect("sid", "client disconnect")
+            return Mock()
+
+        self.prices.acquire.side_effect = acquire
+        asyncio.run(app.backtest("sid", DATA))
+        assert not self.pool.submit.called
+        assert app.price_handles == {}
+        assert len(self.released()) == 1
+
+    def test_backtests_submitted_while_prices_are_loading(self):
+        async def submit_twice():
+            await asyncio.gather(app.backtest("sid", DATA), app.backtest("sid", DATA))
+
+        asyncio.run(submit_twice())
+        handles = [call.args[2] for call in self.pool.submit.call_args_list]
+        # the second backtest replaces the first one, whose handle is released
+        assert len(handles) == 2 and app.price_handles == {"sid": handles[1]}
+        assert self.pool.cancel.call_args.args == ("sid",)
+        assert self.released() == [handles[0]]
+
+        app.disconnect("sid", "client disconnect")
+        assert self.released() == handles
+
+
+class TestSweepEndpoint:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.pool = Mock()
+        self.scheduler = JobScheduler(self.pool, max_concurrency=3)
+        monkeypatch.setattr(app, "scheduler", self.scheduler)
+        self.request = SweepRequest(config={"strategy": "Baseline"}, space={})
+
+    def test_sweep_takes_the_free_slots(self, monkeypatch):
+        self.scheduler.submit("running")
+
+        def run_sweep(max_workers: int, **kwargs):
+            # backtests submitted during the sweep wait for its slots
+            self.scheduler.submit("queued")
+            assert self.scheduler.status()["queued"] == 1
+            return [{"workers": max_workers}]
+
+        monkeypatch.setattr(app, "run_sweep", run_sweep)
+        assert asyncio.run(app.sweep(self.request)) == [{"workers": 2}]
+        assert self.scheduler.status()["reserved"] == 0
+        assert self.scheduler.status()["running"] == 2
+
+    def test_no_free_slots(self, monkeypatch):
+        for i in range(3):
+            self.scheduler.submit(f"job-{i}")
+        monkeypatch.setattr(app, "run_sweep", Mock())
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(app.sweep(self.request))
+        assert e.value.status_code == 503
+        assert not app.run_sweep.called
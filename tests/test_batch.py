@@ -0,0 +1,38 @@
+import json
+
+from backtest_env import price_store
+from backtest_env.batch import main
+from backtest_env.strategies.trend_follower import TrendFollower
+from scripts.bench_utils import generate_prices
+from utils import create_args, write_csv
+
+
+def test_batch_results_match_sequential_runs(tmp_path):
+    prices = generate_prices(10_000)
+    write_csv(str(tmp_path / "TEST_1m.csv"), prices)
+    configs = [
+        create_args("TrendFollower", gridSize=grid_size, interval=interval)
+        for grid_size in [3, 5]
+        for interval in [4, 8]
+    ]
+    configs.append(create_args("Baseline", symbol="MISSING"))
+    configs_file, output_file = tmp_path / "configs.jsonl", tmp_path / "results.jsonl"
+    configs_file.write_text("\n".join(json.dumps(config) for config in configs))
+
+    main([str(configs_file), "-o", str(output_file), "-j", "2", "--data-dir", str(tmp_path)])
+
+    results = sorted(
+        (json.loads(line) for line in output_file.read_text().splitlines()),
+        key=lambda result: result["index"],
+    )
+    assert [result["config"] for result in results] == configs
+    assert "error" in results[-1]
+
+    price_store.register("TEST", "1m", prices)
+    for config, result in zip(configs[:-1], results[:-1], strict=True):
+        strategy = TrendFollower.from_cfg(config)
+        strategy.run()
+        assert result["pnl"] == strategy.position_manager.get_pnl(0.0)
+        assert result["fills"] == len(strategy.order_manager.filled_orders) > 0
+        assert result["candles"] == 10_000
+    price_store.detach("TEST", "1m")
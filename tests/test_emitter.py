@@ -0,0 +1,90 @@
+import threading
+from unittest.mock import Mock
+
+from backtest_env.emitter import FrameEmitter
+
+
+def sent_events(sio: Mock) -> list:
+    return [call.args for call in sio.emit.call_args_list]
+
+
+def test_states_are_coalesced_and_streams_batched():
+    sio = Mock()
+    # a low frame rate, so everything below ends up in the frame sent by close()
+    emitter = FrameEmitter(sio, max_fps=1)
+    emitter.flush()
+
+    for i in range(3):
+        emitter.emit("new_candle", {"close": i})
+        emitter.emit("fills", [i, i])
+        emitter.emit("positions", [i])
+        emitter.emit("pnl", i)
+    emitter.close()
+
+    frames = [args[1] for args in sent_events(sio) if args[0] == "frame"]
+    merged = {}
+    for frame in frames:
+        for key, value in frame.items():
+            merged.setdefault(key, []).append(value)
+
+    assert sum(merged["new_candle"], []) == [{"close": 0}, {"close": 1}, {"close": 2}]
+    assert sum(merged["fills"], []) == [0, 0, 1, 1, 2, 2]
+    # only the latest state is sent
+    assert merged["pnl"][-1] == 2
+    assert len(frames) <= 2
+
+
+def test_control_events_are_sent_after_buffered_events():
+    sio = Mock()
+    emitter = FrameEmitter(sio, max_fps=1)
+    emitter.flush()
+    emitter.emit("new_candle", {"close": 1})
+    emitter.emit("ready", {})
+    emitter.close()
+
+    events = [args[0] for args in sent_events(sio)]
+    assert events.index("frame") < events.index("ready")
+
+
+def test_backpressure():
+    sent = []
+    # the front-end acks each frame 10ms after it's sent
+    slow_socket = Mock()
+    slow_socket.emit.side_effect = lambda event, frame, callback=None: (
+        sent.extend(frame["new_candle"]),
+        threading.Timer(0.01, callback).start(),
+    )
+    emitter = FrameEmitter(slow_socket, max_fps=1000, max_buffer=10, max_in_flight=2)
+
+    producer = threading.Thread(target=lambda: [emitter.emit("new_candle", i) for i in range(100)])
+    producer.start()
+    producer.join(timeout=5)
+    emitter.close()
+
+    assert not producer.is_alive()
+    assert sent == list(range(100))
+    assert emitter.buffered == 0
+
+
+def test_producer_waits_for_acks():
+    # a front-end that doesn't ack yet: one frame in flight, then the buffer fills up
+    acks, acking = [], threading.Event()
+    socket = Mock()
+    socket.emit.side_effect = lambda event, frame, callback=None: (
+        callback() if acking.is_set() else acks.append(callback)
+    )
+    emitter = FrameEmitter(socket, max_fps=1000, max_buffer=10, max_in_flight=1)
+
+    producer = threading.Thread(target=lambda: [emitter.emit("new_candle", i) for i in range(100)])
+    producer.start()
+    producer.join(timeout=0.2)
+    assert producer.is_alive()
+    assert len(acks) == 1 and emitter.buffered == 10
+
+    # acks from the front-end let the producer continue
+    acking.set()
+    acks.pop()()
+    producer.join(timeout=5)
+    assert not producer.is_alive()
+    emitter.close()
+    assert emitter.in_flight == 0
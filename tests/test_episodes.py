@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from backtest_env import price_store
+from backtest_env.episodes import plan_chunks, run_episodes
+from backtest_env.strategies.trend_follower import TrendFollower
+from scripts.bench_utils import generate_prices
+from utils import create_args, write_csv
+
+ONE_DAY = 86_400_000
+
+
+def test_plan_chunks():
+    # 10 days of 1h candles
+    open_times = 1704067200000 + np.arange(240) * 3_600_000
+    chunks = plan_chunks(open_times, ONE_DAY, 2 * ONE_DAY, num_chunks=3)
+    assert chunks == [(0, -1, 96), (48, 96, 168), (120, 168, 239)]
+    # the warm-up of a chunk near the start is cut at the first candle
+    assert plan_chunks(open_times, ONE_DAY, 5 * ONE_DAY, num_chunks=3)[1] == (0, 96, 168)
+    # no boundary, a single chunk
+    assert plan_chunks(open_times[1:20], ONE_DAY, 0, num_chunks=3) == [(0, -1, 18)]
+
+
+@pytest.mark.parametrize("num_chunks", [2, 5])
+def test_episodes_match_sequential_run(tmp_path, num_chunks):
+    # 10 days of candles
+    prices = generate_prices(14_400)
+    write_csv(str(tmp_path / "TEST_1m.csv"), prices)
+    config = create_args("TrendFollower", candleCacheSize=2)
+    result = run_episodes(config, num_chunks, max_workers=2, data_dir=str(tmp_path))
+
+    price_store.register("TEST", "1m", prices)
+    strategy = TrendFollower.from_cfg({**config, "recordEquity": True})
+    strategy.run()
+    price_store.detach("TEST", "1m")
+
+    expected = strategy.get_result()
+    assert result["pnl"] == pytest.approx(expected["pnl"], abs=1e-6)
+    assert result["fills"] == expected["fills"] > 0
+    assert result["candles"] == expected["candles"]
+    assert np.allclose(result["equity"], strategy.equity)
+    fills = [(o["filledAt"], o["side"], o["price"], o["quantity"]) for o in result["filledOrders"]]
+    expected_fills = [
+        (o.filled_at // 1000, o.side, o.price, o.quantity)
+        for o in strategy.order_manager.filled_orders
+    ]
+    assert fills == expected_fills
+
+
+def test_strategies_without_episodes_are_rejected():
+    with pytest.raises(ValueError):
+        run_episodes(create_args("Baseline"))
@@ -0,0 +1,82 @@
+import time
+
+from backtest_env.base.event_hub import Event, EventBus
+
+
+class LegacyEventBus:
+    # the previous implementation: one Event (and one clock read) per handler
+    def __init__(self):
+        self.handlers: dict[str, list[callable]] = {}
+
+    def subscribe(self, event_name: str, handler: callable):
+        self.handlers.setdefault(event_name, []).append(handler)
+
+    def publish(self, event_name: str, data: any):
+        for fn in self.handlers.get(event_name, []):
+            fn(Event(data, time.time_ns() // 1_000_000))
+
+
+def test_raw_and_event_handlers_keep_subscription_order():
+    bus = EventBus()
+    received = []
+    bus.subscribe("x", lambda e: received.append(("event", e.data, e.timestamp)))
+    bus.subscribe("x", lambda data: received.append(("raw", data)), raw=True)
+
+    bus.publish("x", 1)
+    assert received == [("event", 1, 0), ("raw", 1)]
+
+
+def test_event_is_shared_and_timestamped_on_demand():
+    bus = EventBus()
+    events = []
+    bus.subscribe("x", events.append)
+    bus.subscribe("x", events.append, timestamp=True)
+
+    bus.publish("x", 1)
+    assert events[0] is events[1]
+    assert events[0].timestamp > 0
+
+
+def test_unsubscribe():
+    bus = EventBus()
+    received = []
+    subscription = bus.subscribe("x", received.append, raw=True, timestamp=True)
+    bus.unsubcribe(subscription)
+    bus.unsubcribe(("unknown", received.append))
+
+    bus.publish("x", 1)
+    assert received == []
+    assert not bus.channel("x").timestamped
+
+
+def measure(publish: callable, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        publish(i)
+    return n / (time.perf_counter() - start)
+
+
+def test_publish_benchmark():
+    # run with -s to see the numbers
+    n = 100_000
+    results = {}
+    for name, bus, kwargs in [
+        ("legacy", LegacyEventBus(), {}),
+        ("event", EventBus(), {}),
+        ("raw", EventBus(), {"raw": True}),
+    ]:
+        total = []
+        for _ in range(3):
+            bus.subscribe("order.filled", lambda e, total=total: total.append(e), **kwargs)
+        results[f"{name}, 3 handlers"] = measure(
+            lambda i, bus=bus: bus.publish("order.filled", i), n
+        )
+        results[f"{name}, no handler"] = measure(lambda i, bus=bus: bus.publish("unknown", i), n)
+        assert len(total) == 3 * n
+
+    channel = EventBus().channel("order.filled")
+    channel.add(lambda data: data, raw=True)
+    results["precompiled channel"] = measure(channel.publish, n)
+
+    for name, rate in results.items():
+        print(f"{name:>22}: {rate:12.0f} publishes/s")
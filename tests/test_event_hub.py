@@ -1,11 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock
 
 import pytest
 
-from backtest_env.base.event_hub import Event, EventHub
+from backtest_env import price_store
+from backtest_env.base.event_hub import Event, EventBus, EventHub
 from backtest_env.order_manager import OrderManager
+from backtest_env.strategies.baseline import Baseline
 from tests.test_position_manager import price
-from utils import create_long_order
+from scripts.bench_utils import generate_prices
+from utils import create_args, create_long_order
 
 
 class TestEventHub:
@@ -56,4 +60,35 @@ class TestEventHub:
         
         hub1.emit('add', 3)
         assert self.counter == 3
-        
\ No newline at end of file
+        
+
+def test_scoped_buses_are_isolated():
+    data = Mock()
+    data.get_current_price.return_value = price(close=500)
+    position_mgrs = [Mock(), Mock()]
+    order_mgrs = [OrderManager(mgr, data, bus=EventBus()) for mgr in position_mgrs]
+
+    order_mgrs[0].add_order(create_long_order(price=500.0))
+    order_mgrs[1].add_order(create_long_order(price=500.0))
+    order_mgrs[0].process_orders()
+
+    assert len(order_mgrs[0].get_order_history()) == 1
+    # the other backtest's order is untouched
+    assert len(order_mgrs[1].get_order_history()) == 0
+    assert len(order_mgrs[1].get_all_orders()) == 1
+
+
+def test_backtests_in_threads():
+    price_store.register("TEST", "1m", generate_prices(5000))
+
+    def run_backtest(_) -> float:
+        strategy = Baseline.from_cfg(create_args())
+        strategy.run()
+        return strategy.position_manager.get_pnl(0.0)
+
+    expected = run_backtest(0)
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(run_backtest, range(8)))
+
+    price_store.detach("TEST", "1m")
+    assert results == [expected] * 8
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from backtest_env import price_store
+from backtest_env.fast_forward import WakeUp, find_next_candle
+from backtest_env.strategies import STRATEGIES
+from scripts.bench_utils import generate_prices
+from utils import create_args
+
+
+def test_find_next_candle():
+    # open, high, low columns are the only ones used
+    prices = np.zeros((1000, 6))
+    prices[:, 0] = np.arange(1000) * 60_000
+    prices[:, 2], prices[:, 3] = 101.0, 99.0
+    prices[700, 2] = 105.0
+    prices[800, 3] = 90.0
+    no_orders = np.array([])
+    # nothing triggers
+    assert find_next_candle(prices, 0, no_orders, WakeUp()) == 1000
+    # an order inside the range of every candle
+    assert find_next_candle(prices, 10, np.array([50.0, 100.0]), WakeUp()) == 10
+    # orders outside the normal range, found in the third chunk
+    assert find_next_candle(prices, 0, np.array([95.0, 104.0]), WakeUp()) == 700
+    assert find_next_candle(prices, 701, np.array([91.0]), WakeUp()) == 800
+    # wake-up conditions
+    assert find_next_candle(prices, 0, no_orders, WakeUp(upper=102.0)) == 700
+    assert find_next_candle(prices, 0, no_orders, WakeUp(lower=95.0)) == 800
+    assert find_next_candle(prices, 0, no_orders, WakeUp(time=300 * 60_000)) == 300
+    assert find_next_candle(prices, 0, np.array([104.0]), WakeUp(time=900 * 60_000)) == 700
+
+
+def run(strategy: str, prices: np.ndarray, fast_forward: bool, **kwargs):
+    config = create_args(strategy, **kwargs)
+    strategy = STRATEGIES[strategy].from_cfg(
+        {**config, "recordEquity": True, "fastForward": fast_forward}
+    )
+    strategy.run()
+    return strategy
+
+
+@pytest.mark.parametrize(
+    "strategy, kwargs", [("TrendFollower", {"candleCacheSize": 2}), ("Baseline", {})]
+)
+def test_fast_forward_matches_full_run(strategy, kwargs):
+    prices = generate_prices(20_000)
+    price_store.register("TEST", "1m", prices)
+    try:
+        expected = run(strategy, prices, False, **kwargs)
+        result = run(strategy, prices, True, **kwargs)
+    finally:
+        price_store.detach("TEST", "1m")
+
+    assert result.get_result() == expected.get_result()
+    assert expected.get_result()["fills"] > 0
+    assert result.equity == pytest.approx(expected.equity)
+    assert [(o.filled_at, o.side, o.price) for o in result.order_manager.filled_orders] == [
+        (o.filled_at, o.side, o.price) for o in expected.order_manager.filled_orders
+    ]
@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+import pytest
+
+from backtest_env import feature_store, price_store
+from backtest_env.feature_store import FEATURES, FeatureStore
+from backtest_env.indicators import DailyRange, rolling_mean
+from backtest_env.price import PriceDataSet
+from scripts.bench_utils import generate_prices
+
+
+@pytest.fixture
+def store(tmp_path):
+    default = feature_store.get_store()
+    feature_store.configure(str(tmp_path / "features"))
+    yield feature_store.get_store()
+    feature_store.store = default
+
+
+def test_features_are_computed_once(store, monkeypatch):
+    prices = generate_prices(1000)
+    column = store.get(prices, "sma", {"period": 20})
+    assert np.allclose(column, rolling_mean(prices[:, 4], 20), equal_nan=True)
+    assert len(os.listdir(store.directory)) == 1
+
+    # the next calls, even from another process, read the saved column
+    monkeypatch.setitem(FEATURES, "sma", None)
+    feature_store.content_hashes.clear()
+    assert np.array_equal(store.get(prices, "sma", {"period": 20}), column, equal_nan=True)
+    # other params or other candles are other features
+    monkeypatch.undo()
+    store.get(prices, "sma", {"period": 10})
+    store.get(generate_prices(1000, seed=1), "sma", {"period": 20})
+    assert len(os.listdir(store.directory)) == 3
+
+    with pytest.raises(ValueError):
+        store.get(prices, "unknown", {})
+
+
+def test_content_hashes_follow_the_candles():
+    expected = {}
+    for seed in range(20):
+        # arrays freed after hashing never give their hash to the next ones
+        prices = generate_prices(100, seed=seed)
+        expected[seed] = feature_store.get_content_hash(prices)
+        assert expected[seed] == feature_store.get_content_hash(prices.copy())
+    assert len(set(expected.values())) == 20
+    # views of the same candles share the cached hash, other slices are other candles
+    prices = generate_prices(100)
+    assert feature_store.get_content_hash(prices[10:]) == feature_store.get_content_hash(
+        prices[10:]
+    )
+    assert feature_store.get_content_hash(prices[10:]) != feature_store.get_content_hash(
+        prices[11:]
+    )
+
+
+def test_least_recently_used_features_are_evicted(tmp_path):
+    prices = generate_prices(1000)
+    # room for 2 columns of 1000 float64
+    store = FeatureStore(str(tmp_path), max_bytes=17_000)
+    first = store.get_path(feature_store.get_content_hash(prices), "sma", {"period": 5})
+    store.get(prices, "sma", {"period": 5})
+    store.get(prices, "sma", {"period": 10})
+    os.utime(first, ns=(0, 0))
+    # using a feature makes it the most recently used one
+    store.get(prices, "sma", {"period": 5})
+    store.get(prices, "sma", {"period": 20})
+    names = os.listdir(tmp_path)
+    assert len(names) == 2 and os.path.basename(first) in names
+
+
+def test_daily_change_matches_streaming():
+    # 10 days of 15m candles starting at 06:00, the first day has no open candle
+    prices = generate_prices(960, tf=900_000, start=1704067200000 + 6 * 3_600_000)
+    column = FEATURES["daily_change"](prices, period=3)
+    open_price, high, low, daily_change = 0.0, 0.0, np.inf, DailyRange(3)
+    for i, (open_time, o, h, lo, c, close_time) in enumerate(prices):
+        high, low = max(high, h), min(low, lo)
+        if open_time % 86_400_000 == 0:
+            open_price = o
+        if (close_time + 1) % 86_400_000 == 0:
+            daily_change.update(open_price or c, high, low)
+            high, low = 0.0, np.inf
+        assert column[i] == pytest.approx(daily_change.value, nan_ok=True)
+    assert not np.isnan(column[-1])
+
+
+def test_price_data_set_features(store):
+    prices = generate_prices(3000)
+    price_store.register("TEST", "1m", prices)
+    try:
+        # starts on the second day, the feature is computed from the first candle
+        data = PriceDataSet("TEST", "1m", "2024-01-02")
+    finally:
+        price_store.detach("TEST", "1m")
+    data.add_feature("high", "rolling_high", period=100)
+    # startTime is in local time
+    start = int(np.searchsorted(prices[:, 0], data.prices[0, 0]))
+    expected = FEATURES["rolling_high"](prices, period=100)[start:]
+    assert np.array_equal(data.get_feature_column("high"), expected)
+
+    data.step()
+    data.step()
+    assert data.get_feature("high") == expected[1]
+    assert data.get_feature("high") == prices[start - 98 : start + 2, 2].max()
+    # features stay aligned with the candles
+    data.narrow(100, 200)
+    assert np.array_equal(data.get_feature_column("high"), expected[100:200])
+
+
+def test_features_without_warmup(store):
+    prices = generate_prices(3000)
+    price_store.register("TEST", "1m", prices)
+    try:
+        data = PriceDataSet("TEST", "1m", "2024-01-02")
+    finally:
+        price_store.detach("TEST", "1m")
+    # computed from the first candle of the backtest, like a streaming indicator
+    data.add_feature("high", "rolling_high", warmup=False, period=100)
+    expected = FEATURES["rolling_high"](data.prices, period=100)
+    assert np.array_equal(data.get_feature_column("high"), expected, equal_nan=True)
+    assert np.isnan(data.get_feature_column("high")[98])
+    # a column of a single backtest isn't saved
+    assert not os.path.exists(store.directory)
+    data.narrow(100, 200)
+    data.step()
+    assert data.get_feature("high") == expected[100]
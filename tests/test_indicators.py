@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from backtest_env.indicators import (
+    ATR,
+    EMA,
+    DailyRange,
+    RingBuffer,
+    RollingMax,
+    RollingMean,
+    RollingMin,
+    RollingStd,
+    atr,
+    daily_range,
+    ema,
+    rolling_max,
+    rolling_mean,
+    rolling_min,
+    rolling_std,
+)
+from scripts.bench_utils import generate_prices
+
+
+def stream(indicator, *columns: np.ndarray) -> np.ndarray:
+    return np.array([indicator.update(*values) for values in zip(*columns, strict=True)])
+
+
+def test_ring_buffer():
+    buffer = RingBuffer(3)
+    assert [buffer.push(v) for v in (1.0, 2.0, 3.0, 4.0)] == [0.0, 0.0, 0.0, 1.0]
+    assert len(buffer) == 3 and buffer.is_full()
+    assert buffer.last() == 4.0
+    assert buffer.to_array().tolist() == [2.0, 3.0, 4.0]
+
+
+@pytest.mark.parametrize("period", [1, 5, 20])
+def test_streaming_matches_batch(period):
+    prices = generate_prices(1000)
+    open_price, high, low, close = prices[:, 1], prices[:, 2], prices[:, 3], prices[:, 4]
+    cases = [
+        (RollingMean(period), rolling_mean(close, period), (close,)),
+        (RollingStd(period), rolling_std(close, period), (close,)),
+        (EMA(period), ema(close, period), (close,)),
+        (ATR(period), atr(high, low, close, period), (high, low, close)),
+        (RollingMax(period), rolling_max(high, period), (high,)),
+        (RollingMin(period), rolling_min(low, period), (low,)),
+        # candles stand in for daily candles
+        (
+            DailyRange(period),
+            daily_range(open_price, high, low, period),
+            (open_price, high, low),
+        ),
+    ]
+    for indicator, expected, columns in cases:
+        values = stream(indicator, *columns)
+        assert np.isnan(values[: period - 1]).all()
+        assert np.allclose(values, expected, equal_nan=True, rtol=1e-10)
+
+
+def test_batch_values():
+    values = np.array([1.0, 3.0, 2.0, 5.0, 4.0])
+    assert np.allclose(rolling_mean(values, 2), [np.nan, 2, 2.5, 3.5, 4.5], equal_nan=True)
+    assert np.allclose(rolling_max(values, 3), [np.nan, np.nan, 3, 5, 5], equal_nan=True)
+    assert np.allclose(rolling_min(values, 3), [np.nan, np.nan, 1, 2, 2], equal_nan=True)
+    assert np.allclose(ema(values, 2), [np.nan, 2, 2, 4, 4], equal_nan=True)
+    # true ranges: 2, then 3 & 3 because of the gap up from close 1
+    high, low, close = np.array([3.0, 4.0, 4.0]), np.array([1.0, 2.0, 3.0]), np.ones(3)
+    assert np.allclose(atr(high, low, close, 2), [np.nan, 2.5, 2.75], equal_nan=True)
+    # shorter than the period
+    assert np.isnan(rolling_std(values[:2], 3)).all()
+
+
+def test_rolling_std_keeps_precision_on_large_prices():
+    # a running sum of squares is off by several times the std here
+    values = 1e5 + np.random.default_rng(0).normal(0, 1e-2, 5000)
+    streamed = stream(RollingStd(50), values)
+    assert np.allclose(streamed[49:], rolling_std(values, 50)[49:], rtol=1e-6)
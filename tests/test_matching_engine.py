@@ -0,0 +1,50 @@
+from unittest.mock import Mock
+
+from backtest_env.base.side import OrderSide
+from backtest_env.matching_engine import VectorizedMatchingEngine
+from backtest_env.order_manager import OrderManager
+from backtest_env.orders.limit import LimitOrder
+from backtest_env.price import Price
+from utils import LegacyOrderManager, create_long_order, simulate
+
+
+def test_crossed_orders_in_insertion_order():
+    engine = VectorizedMatchingEngine(capacity=2)
+    orders = [LimitOrder(OrderSide.BUY, p, "X", p) for p in [110.0, 90.0, 100.0]]
+    market = create_long_order()
+    for order in orders + [market]:
+        engine.add(order)
+
+    assert engine.crossed(100.0, 110.0) == [orders[0], orders[2], market]
+
+    # the freed slot is reused by a newer order, it must still come last
+    engine.remove(orders[0])
+    newer = LimitOrder(OrderSide.SELL, 105.0, "X", 105.0)
+    engine.add(newer)
+    assert engine.crossed(100.0, 110.0) == [orders[2], market, newer]
+    assert len(engine) == 4
+
+    engine.clear()
+    assert engine.crossed(0.0, 1000.0) == []
+
+
+def test_fills_match_legacy_order_manager():
+    for seed in range(5):
+        assert simulate(
+            OrderManager, seed, matching_engine=VectorizedMatchingEngine(capacity=8)
+        ) == simulate(LegacyOrderManager, seed)
+
+
+def test_thousands_of_resting_orders():
+    dataset = Mock()
+    order_mgr = OrderManager(Mock(), dataset, matching_engine=VectorizedMatchingEngine())
+    order_mgr.add_orders(
+        [LimitOrder(OrderSide.BUY, 100.0, "X", 100.0 + i * 0.01) for i in range(5000)]
+    )
+
+    dataset.get_current_price.return_value = Price(0, 110, 110.005, 109.995, 110, 0)
+    order_mgr.process_orders()
+
+    assert [order.price for order in order_mgr.get_order_history()] == [110.0]
+    assert len(order_mgr.get_all_orders()) == 4999
+    order_mgr.unsubscribe()
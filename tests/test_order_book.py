@@ -0,0 +1,60 @@
+from backtest_env.base.side import OrderSide
+from backtest_env.order_book import OrderBook
+from backtest_env.order_manager import OrderManager
+from backtest_env.orders.limit import LimitOrder
+from utils import LegacyOrderManager, create_long_order, simulate
+
+
+def limit(side: OrderSide, price: float) -> LimitOrder:
+    return LimitOrder(side, price, "X", price)
+
+
+def test_crossed_orders():
+    book = OrderBook()
+    orders = [limit(OrderSide.BUY, p) for p in [90.0, 100.0, 110.0]]
+    orders += [limit(OrderSide.SELL, p) for p in [95.0, 105.0]]
+    market = create_long_order()
+    for order in orders + [market]:
+        book.add(order)
+
+    # boundaries are included, results are in insertion order
+    assert book.crossed(100.0, 110.0) == [orders[1], orders[2], orders[4], market]
+    assert book.crossed(0.0, 1.0) == [market]
+
+    book.remove(orders[1])
+    book.remove(market)
+    assert book.crossed(100.0, 110.0) == [orders[2], orders[4]]
+    assert len(book) == 4
+
+    book.clear()
+    assert book.crossed(0.0, 1000.0) == []
+
+
+def test_fills_match_legacy_order_manager():
+    for seed in range(5):
+        assert simulate(OrderManager, seed) == simulate(LegacyOrderManager, seed)
+
+
+def test_side_queries():
+    book = OrderBook()
+    assert book.count(OrderSide.BUY) == 0
+    assert book.latest(OrderSide.BUY) is None
+    assert book.best_price(OrderSide.BUY) is None
+
+    buys = [
+        LimitOrder(OrderSide.BUY, p, "X", p, created_at=t) for p, t in [(90, 2), (110, 1), (100, 2)]
+    ]
+    sells = [LimitOrder(OrderSide.SELL, p, "X", p, created_at=t) for p, t in [(120, 0), (105, 0)]]
+    for order in buys + sells:
+        book.add(order)
+
+    # sorted by creation time, ties keep the insertion order
+    assert book.orders_by_side(OrderSide.BUY) == [buys[1], buys[0], buys[2]]
+    assert book.latest(OrderSide.BUY) is buys[2]
+    assert book.count(OrderSide.SELL) == 2
+    assert (book.best_price(OrderSide.BUY), book.worst_price(OrderSide.BUY)) == (110, 90)
+    assert (book.best_price(OrderSide.SELL), book.worst_price(OrderSide.SELL)) == (105, 120)
+
+    book.remove(buys[2])
+    assert book.latest(OrderSide.BUY) is buys[0]
+    assert book.count(OrderSide.BUY) == 2
@@ -4,6 +4,7 @@ import pytest
 
 from backtest_env.base.order import OrderType, OrderSide, PositionSide, Order
 from backtest_env.order_manager import OrderManager
+from backtest_env.position_manager import PositionManager
 from backtest_env.orders.limit import LimitOrder
 from backtest_env.orders.oco import OneCancelOtherOrder
 from backtest_env.price import Price
@@ -140,3 +141,27 @@ class TestOrderManager:
         self.assert_order_eq(
             orders[1], LimitOrder(OrderSide.SELL, 330.0, "X", 110, PositionSide.LONG)
         )
+
+
+def test_fills_are_emitted_once_per_candle():
+    sio = Mock()
+    data = Mock()
+    position_mgr = PositionManager(10000.0, sio)
+    order_mgr = OrderManager(position_mgr, data, sio)
+    order_mgr.add_orders([LimitOrder(OrderSide.BUY, p, "X", p) for p in [100.0, 101.0, 102.0]])
+    sio.reset_mock()
+
+    # the candle sweeps through every order
+    data.get_current_price.return_value = Price(0, 100, 102, 100, 102, 0)
+    order_mgr.process_orders()
+    assert position_mgr.long.quantity == 3.0
+    assert sio.emit.call_count == 0
+
+    order_mgr.flush_fills()
+    assert [call.args[0] for call in sio.emit.call_args_list] == ["fills", "positions"]
+    assert len(sio.emit.call_args_list[0].args[1]) == 3
+
+    # nothing was filled since the last flush
+    order_mgr.flush_fills()
+    assert sio.emit.call_count == 2
+    order_mgr.unsubscribe()
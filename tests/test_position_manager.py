@@ -178,3 +178,10 @@ class TestPositionManager:
         # 0.5 short at 300, pnl += 37.5
         # 0.5 long at 200, pnl += 12.5
         assert self.position_mgr.get_pnl(0.0) == 37.5 + 25 + 12.5
+
+    def test_equity_matches_pnl(self):
+        self.position_mgr.fill(create_long_order(price=200.0))
+        self.position_mgr.fill(create_short_order(price=250.0, quantity=0.5))
+        for close in [150.0, 222.22, 300.0]:
+            equity = self.position_mgr.get_equity(close)
+            assert equity == pytest.approx(self.initial_balance + self.position_mgr.get_pnl(close))
@@ -1,8 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 import numpy as np
 
+from backtest_env import price
 from backtest_env.price import PriceDataSet, Price
+from scripts.bench_utils import generate_prices
 
 mock_data = np.array(
     [
@@ -53,3 +56,91 @@ def test_get_last_price(mock_utils):
 
     price = dataset.get_last_price()
     assert_price(price, mock_data[1])
+
+
+@patch("backtest_env.price.load_price_data")
+def test_slice(mock_utils):
+    mock_utils.return_value = mock_data
+    dataset = PriceDataSet("BNB", "1h", "2025-02-27", "2025-02-28")
+
+    assert np.array_equal(dataset.slice(1740589200000, 1740589200000), mock_data[:1])
+    assert np.array_equal(dataset.slice(1740589200001), mock_data[1:])
+    assert len(dataset.slice(0, 1740589199999)) == 0
+    # slices are views of the dataset
+    assert np.shares_memory(dataset.slice(0), mock_data)
+
+
+@patch("backtest_env.price.load_price_data")
+def test_window(mock_utils):
+    mock_utils.return_value = mock_data
+    dataset = PriceDataSet("BNB", "1h", "2025-02-27", "2025-02-28")
+
+    assert len(dataset.window(5)) == 0
+
+    dataset.step()
+    assert np.array_equal(dataset.window(5), mock_data[:1])
+
+    dataset.step()
+    assert np.array_equal(dataset.window(1), mock_data[1:])
+    assert np.array_equal(dataset.window(5), mock_data)
+
+
+@patch("backtest_env.price.load_price_data")
+def test_cursor_is_reused(mock_utils):
+    mock_utils.return_value = mock_data
+    dataset = PriceDataSet("BNB", "1h", "2025-02-27", "2025-02-28")
+
+    first = dataset.step()
+    assert dataset.has_next()
+    second = dataset.step()
+    assert first is second
+    assert_price(dataset.get_current_price(), mock_data[1])
+    assert dataset.get_close_price() == 10.0
+    assert dataset.get_close_time() == 1740761999999
+
+    assert not dataset.has_next()
+    assert dataset.step() is None
+
+
+@patch("backtest_env.price.load_price_data")
+def test_resampled_bars_are_never_ahead_of_the_cursor(mock_utils):
+    # 2 days of 1h candles
+    prices = generate_prices(48, tf=3_600_000)
+    mock_utils.return_value = prices
+    dataset = PriceDataSet("BNB", "1h", "2024-01-01")
+
+    assert dataset.get_last_bar("1d") is None
+    for _ in range(23):
+        dataset.step()
+    assert dataset.count_bars("1d") == 0
+    assert len(dataset.get_bars("4h", 10)) == 5
+
+    # the last candle of the first day completes the daily bar
+    dataset.step()
+    day = prices[:24]
+    assert_price(
+        dataset.get_last_bar("1d"),
+        [day[0, 0], day[0, 1], day[:, 2].max(), day[:, 3].min(), day[-1, 4], day[-1, 5]],
+    )
+    assert np.array_equal(dataset.get_bars("4h", 2)[:, 4], prices[[19, 23], 4])
+    # one 1m file serves every timeframe, bars are cached by candles & timeframe
+    other = PriceDataSet("BNB", "1h", "2024-01-01")
+    assert other.resample("4h")[0] is dataset.resample("4h")[0]
+
+
+@patch("backtest_env.price.RESAMPLE_CACHE_SIZE", 2)
+@patch("backtest_env.price.load_price_data")
+def test_resample_cache_is_shared_by_threads(mock_utils):
+    # backtests on a thread pool resample other candles & timeframes while the cache evicts bars
+    mock_utils.return_value = generate_prices(2000)
+    price.resampled_prices.clear()
+    timeframes = ["5m", "15m", "1h", "4h"] * 50
+
+    def resample(tf: str) -> np.ndarray:
+        return PriceDataSet("BNB", "1m", "2024-01-01").resample(tf)[0]
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(resample, timeframes))
+    for tf, bars in zip(timeframes, results, strict=True):
+        assert np.array_equal(bars, resample(tf))
+    assert len(price.resampled_prices) <= 2
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from backtest_env import price_store
+from backtest_env.price import PriceDataSet
+from backtest_env.price_store import SharedPriceStore
+from utils import write_csv
+
+rows = [
+    [1740589200000, 10.0, 11.0, 9.0, 9.5, 1740675599999],
+    [1740675600000, 9.5, 12.0, 9.4, 10.0, 1740761999999],
+]
+
+
+class TestSharedPriceStore:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        write_csv(str(tmp_path / "BNB_1d.csv"), rows)
+        self.store = SharedPriceStore(str(tmp_path))
+        yield
+        self.store.close()
+        price_store.detach("BNB", "1d")
+
+    def test_reference_counting(self):
+        handle = self.store.acquire("BNB", "1d")
+        self.store.acquire("BNB", "1d")
+        assert ("BNB", "1d") in self.store
+
+        self.store.release(handle)
+        assert ("BNB", "1d") in self.store
+
+        # the last backtest exits, prices are evicted
+        self.store.release(handle)
+        assert ("BNB", "1d") not in self.store
+
+    def test_attach_is_read_only(self):
+        prices = price_store.attach(self.store.acquire("BNB", "1d"))
+
+        assert np.array_equal(prices, np.array(rows))
+        with pytest.raises(ValueError):
+            prices[0, 0] = 0
+
+    def test_dataset_uses_attached_prices(self):
+        price_store.attach(self.store.acquire("BNB", "1d"))
+        dataset = PriceDataSet("BNB", "1d", "2025-02-26", "2025-03-01")
+
+        assert len(dataset) == 2
+        assert dataset[1].close == 10.0
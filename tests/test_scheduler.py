@@ -0,0 +1,67 @@
+from unittest.mock import Mock
+
+import pytest
+
+from backtest_env.scheduler import JobScheduler
+
+
+class TestJobScheduler:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.pool = Mock()
+        self.finished = []
+        self.scheduler = JobScheduler(
+            self.pool, max_concurrency=2, on_finished=self.finished.append
+        )
+
+    def started_jobs(self) -> list[str]:
+        return [call.args[0] for call in self.pool.submit.call_args_list]
+
+    def test_concurrency_limit(self):
+        positions = [self.scheduler.submit(f"job-{i}", i) for i in range(4)]
+        assert positions == [0, 0, 1, 2]
+        assert self.started_jobs() == ["job-0", "job-1"]
+
+        # the pool reports job-0 is finished, job-2 takes its slot
+        self.pool.on_finished("job-0")
+        self.scheduler.poll()
+        assert self.finished == ["job-0"]
+        assert self.started_jobs() == ["job-0", "job-1", "job-2"]
+        assert self.scheduler.status()["running"] == 2
+        assert self.scheduler.status()["queued"] == 1
+
+    def test_priority_then_fifo(self):
+        for i in range(2):
+            self.scheduler.submit(f"running-{i}")
+        self.scheduler.submit("low", priority=-1)
+        self.scheduler.submit("normal-0")
+        self.scheduler.submit("high", priority=1)
+        self.scheduler.submit("normal-1")
+        assert self.scheduler.get_position_updates() == {
+            "high": 1,
+            "normal-0": 2,
+            "normal-1": 3,
+            "low": 4,
+        }
+
+        self.pool.on_finished("running-0")
+        self.pool.on_finished("running-1")
+        self.scheduler.poll()
+        assert self.started_jobs()[2:] == ["high", "normal-0"]
+        # only changed positions are reported
+        assert self.scheduler.get_position_updates() == {"normal-1": 1, "low": 2}
+        assert self.scheduler.get_position_updates() == {}
+
+    def test_cancel(self):
+        for i in range(4):
+            self.scheduler.submit(f"job-{i}")
+
+        assert self.scheduler.cancel("job-2")
+        assert self.scheduler.get_position_updates() == {"job-3": 1}
+        assert self.scheduler.cancel("job-0")
+        self.pool.cancel.assert_called_once_with("job-0")
+        # the freed slot is given to the next queued job, cancelled jobs aren't reported
+        assert self.started_jobs() == ["job-0", "job-1", "job-3"]
+        assert not self.scheduler.cancel("job-0")
+        self.pool.on_finished("job-0")
+        assert self.finished == []
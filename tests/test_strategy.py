@@ -0,0 +1,65 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+from pydantic import ValidationError
+
+from backtest_env import price_store
+from backtest_env.emitter import FrameEmitter
+from backtest_env.strategies.baseline import Baseline
+from scripts.bench_utils import generate_prices
+from utils import create_args
+
+
+def create_live_strategy(steps_per_request: int) -> tuple[Baseline, Mock]:
+    strategy = Baseline.from_cfg(create_args(stepsPerRequest=steps_per_request))
+    # fake socket: acks every emit right away, disconnect() fires the disconnect event
+    sio = Mock()
+    sio.emit.side_effect = lambda event, data, callback=None: callback and callback()
+    sio.disconnect.side_effect = strategy.on_disconnect
+    strategy.socketio = sio
+    strategy.emitter = FrameEmitter(sio, max_fps=1000)
+    return strategy, sio
+
+
+def test_live_mode_advances_n_candles_per_request():
+    price_store.register("TEST", "1m", generate_prices(100))
+    strategy, sio = create_live_strategy(steps_per_request=10)
+    thread = threading.Thread(target=strategy.run, args=(True,))
+    thread.start()
+
+    requests = 0
+    while not strategy.finished.is_set():
+        strategy.next({})
+        requests += 1
+    thread.join(timeout=1)
+
+    assert not thread.is_alive()
+    # 99 candles are updated, the 100th is cleaned up
+    assert requests == 10
+    assert strategy.data.idx == 99
+    ready_events = [call for call in sio.emit.call_args_list if call.args[0] == "ready"]
+    assert len(ready_events) == 10
+    price_store.detach("TEST", "1m")
+
+
+def test_live_mode_stops_when_front_end_disconnects():
+    price_store.register("TEST", "1m", generate_prices(100))
+    strategy, _ = create_live_strategy(steps_per_request=1)
+    thread = threading.Thread(target=strategy.run, args=(True,))
+    thread.start()
+
+    strategy.next({})
+    strategy.on_disconnect("client disconnect")
+    thread.join(timeout=1)
+
+    assert not thread.is_alive()
+    # requests received after the disconnect are ignored
+    strategy.next({})
+    assert strategy.data.idx == 0
+    price_store.detach("TEST", "1m")
+
+
+def test_steps_per_request_is_positive():
+    with pytest.raises(ValidationError):
+        Baseline.from_cfg(create_args(stepsPerRequest=0))
@@ -0,0 +1,71 @@
+import pytest
+
+from backtest_env.sweep import (
+    expand_grid,
+    expand_random,
+    run_combinations,
+    run_sweep,
+    to_field_name,
+)
+from backtest_env.utils import get_max_drawdown
+from scripts.bench_utils import generate_prices
+from utils import create_args, write_csv
+
+
+def test_to_field_name():
+    assert to_field_name("Candle Cache Size") == "candleCacheSize"
+    assert to_field_name("Interval") == "interval"
+    assert to_field_name("gridSize") == "gridSize"
+
+
+def test_expand_grid():
+    combinations = expand_grid(
+        "TrendFollower", {"Grid Size": [3, 5], "interval": {"min": 2, "max": 6, "step": 2}}
+    )
+    assert combinations == [{"gridSize": g, "interval": i} for g in [3, 5] for i in [2, 4, 6]]
+    with pytest.raises(ValueError):
+        expand_grid("TrendFollower", {"Unknown": [1]})
+
+
+def test_expand_random():
+    space = {"Grid Size": {"min": 2, "max": 20}, "Order Size": [10, 100]}
+    combinations = expand_random("TrendFollower", space, samples=50, seed=1)
+    assert combinations == expand_random("TrendFollower", space, samples=50, seed=1)
+    assert all(2 <= c["gridSize"] <= 20 and isinstance(c["gridSize"], int) for c in combinations)
+    assert {c["orderSize"] for c in combinations} == {10, 100}
+
+
+def test_max_drawdown():
+    assert get_max_drawdown([100.0, 120.0, 90.0, 130.0, 117.0]) == 0.25
+    assert get_max_drawdown([100.0, 101.0]) == 0.0
+
+
+def test_run_sweep(tmp_path):
+    write_csv(str(tmp_path / "TEST_1m.csv"), generate_prices(10_000))
+    space = {"Grid Size": [3, 5], "Interval": [4, 8]}
+    rows = run_sweep(create_args("TrendFollower"), space, max_workers=2, data_dir=str(tmp_path))
+
+    assert len(rows) == 4
+    assert {(row["gridSize"], row["interval"]) for row in rows} == {(3, 4), (3, 8), (5, 4), (5, 8)}
+    assert [row["pnl"] for row in rows] == sorted((row["pnl"] for row in rows), reverse=True)
+    assert all(row["fills"] > 0 and 0 <= row["maxDrawdown"] < 1 for row in rows)
+
+
+def test_successive_halving(tmp_path):
+    # 2 weeks of candles
+    write_csv(str(tmp_path / "TEST_1m.csv"), generate_prices(20_000))
+    config = create_args("TrendFollower")
+    space = {"Order Size": [50, 100, 150, 200], "Interval": [4, 8]}
+    halving = {"eta": 2, "rungs": 3, "metric": "pnl"}
+    rows = run_sweep(config, space, halving=halving, max_workers=2, data_dir=str(tmp_path))
+
+    # 8 combinations on 1/4 of the range, 4 on 1/2, 2 on the full range
+    assert [row["rung"] for row in rows] == [2, 2, 1, 1, 0, 0, 0, 0]
+    assert rows[0]["endTime"] is None
+    assert len({(row["orderSize"], row["interval"]) for row in rows}) == 8
+    # survivors have the same results as a run on the full range
+    survivors = [{"orderSize": row["orderSize"], "interval": row["interval"]} for row in rows[:2]]
+    full = run_combinations(config, survivors, max_workers=2, data_dir=str(tmp_path))
+    assert [row["pnl"] for row in full] == [row["pnl"] for row in rows[:2]]
+    # pruned combinations were run on shorter ranges
+    assert rows[4]["endTime"] < rows[2]["endTime"]
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from backtest_env import price_store
+from backtest_env.strategies.trend_follower import TrendFollower
+from scripts.bench_utils import generate_prices
+from utils import create_args
+
+
+class HandBuiltDailyCandles(TrendFollower):
+    # daily candles built by hand from each candle, like TrendFollower did before resampling
+    def __init__(self, args):
+        super().__init__(args)
+        self.open, self.high, self.low = 0.0, 0.0, np.inf
+
+    def get_wake_up(self):
+        return None
+
+    def update_statistic(self):
+        price = self.data.get_current_price()
+        self.high, self.low = max(self.high, price.high), min(self.low, price.low)
+        if price.open_time % 86_400_000 == 0:
+            self.open = price.open
+        if (price.close_time + 1) % 86_400_000 == 0:
+            self.daily_change.update(self.open or price.close, self.high, self.low)
+            self.high, self.low = 0.0, np.inf
+            if self.daily_change.ready:
+                self.update_step_size()
+
+
+def run(cls, prices: np.ndarray, **kwargs):
+    config = create_args("TrendFollower", candleCacheSize=1, interval=1, **kwargs)
+    price_store.register("TEST", "1m", prices)
+    try:
+        strategy = cls.from_cfg(config)
+        strategy.run()
+    finally:
+        price_store.detach("TEST", "1m")
+    return strategy
+
+
+def start_after_midnight(seed: int) -> np.ndarray:
+    # 5 days of candles starting at 13:00 UTC, like a run starting at midnight in UTC+7 local time,
+    # the first day has no open candle
+    return generate_prices(7200, start=1704067200000 + 13 * 3_600_000, seed=seed)
+
+
+def volatile_midnight() -> np.ndarray:
+    # the daily change is ready at the last candle of the first day, the grid orders placed there
+    # are filled by the next candle (a ±30% range) before its positions are closed
+    prices = generate_prices(4320)
+    prices[1440, 2] *= 1.3
+    prices[1440, 3] *= 0.7
+    return prices
+
+
+@pytest.mark.parametrize(
+    "prices",
+    [
+        start_after_midnight(0),
+        start_after_midnight(2),
+        start_after_midnight(5),
+        volatile_midnight(),
+    ],
+    ids=["seed-0", "seed-2", "seed-5", "volatile-midnight"],
+)
+@pytest.mark.parametrize("fast_forward", [False, True])
+def test_daily_candles_match_hand_built_ones(prices, fast_forward):
+    expected = run(HandBuiltDailyCandles, prices)
+    result = run(TrendFollower, prices, fastForward=fast_forward)
+
+    assert result.get_result() == expected.get_result()
+    assert expected.get_result()["fills"] > 0
+    assert [(o.filled_at, o.side, o.price) for o in result.order_manager.filled_orders] == [
+        (o.filled_at, o.side, o.price) for o in expected.order_manager.filled_orders
+    ]
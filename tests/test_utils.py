@@ -1,4 +1,16 @@
-from backtest_env.utils import convert_datetime_to_nanosecond
+import os
+
+import numpy as np
+import pytest
+
+from backtest_env.utils import (
+    convert_datetime_to_nanosecond,
+    get_cache_name,
+    get_timeframe_length,
+    read_price_data,
+    resample_price_data,
+)
+from utils import write_csv
 
 
 def test_convert_time_to_nanosecond():
@@ -11,3 +23,56 @@ def test_convert_time_to_nanosecond():
             convert_datetime_to_nanosecond(input_dates[i], date_formats[i])
             == expected_timestamps[i]
         )
+
+
+def test_read_price_data_builds_cache(tmp_path):
+    file_name = str(tmp_path / "BNB_1h.csv")
+    rows = [[0, 10.0, 11.0, 9.0, 9.5, 999], [1000, 9.5, 12.0, 9.4, 10.0, 1999]]
+    write_csv(file_name, rows)
+
+    data = read_price_data(file_name)
+    assert os.path.exists(get_cache_name(file_name))
+    assert np.array_equal(data, np.array(rows))
+
+    # second read uses the memory-mapped cache
+    assert isinstance(read_price_data(file_name), np.memmap)
+
+
+def test_read_price_data_rebuilds_stale_cache(tmp_path):
+    file_name = str(tmp_path / "BNB_1h.csv")
+    write_csv(file_name, [[0, 10.0, 11.0, 9.0, 9.5, 999]])
+    read_price_data(file_name)
+
+    rows = [[0, 10.0, 11.0, 9.0, 9.5, 999], [1000, 9.5, 12.0, 9.4, 10.0, 1999]]
+    write_csv(file_name, rows)
+    # make sure the new csv has a different mtime even on coarse-grained file systems
+    os.utime(file_name, ns=(0, 1_000_000_000))
+
+    assert np.array_equal(read_price_data(file_name), np.array(rows))
+
+
+def test_get_timeframe_length():
+    assert get_timeframe_length("15m") == 900_000
+    assert get_timeframe_length("4h") == 14_400_000
+    assert get_timeframe_length("1d") == 86_400_000
+    with pytest.raises(ValueError):
+        get_timeframe_length("1w")
+
+
+def test_resample_price_data():
+    # 1h candles from 22:00 to 04:00 (next day), the 03:00 candle is missing
+    hours = [22, 23, 24, 25, 26, 28]
+    data = np.array(
+        [[h * 3_600_000, h, h + 10, h - 10, h + 1, (h + 1) * 3_600_000 - 1] for h in hours],
+        dtype=np.float64,
+    )
+    bars, completed = resample_price_data(data, 4 * 3_600_000)
+
+    assert bars.tolist() == [
+        [20 * 3_600_000, 22, 33, 12, 24, 24 * 3_600_000 - 1],
+        [24 * 3_600_000, 24, 36, 14, 27, 28 * 3_600_000 - 1],
+        [28 * 3_600_000, 28, 38, 18, 29, 32 * 3_600_000 - 1],
+    ]
+    # the first bar is completed by the 23:00 candle, the second one (missing its last candle) is
+    # only known to be completed at the 04:00 candle, the last one is still forming
+    assert completed.tolist() == [0, 1, 1, 1, 1, 2]
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from backtest_env import price_store
+from backtest_env.base.signal_strategy import SignalStrategy
+from backtest_env.indicators import rolling_mean
+from backtest_env.vectorized import Signals, run_signals
+from scripts.bench_utils import generate_prices
+from utils import create_args
+
+
+class RandomSignals(SignalStrategy):
+    # like Baseline: market orders of random sides, positions are closed from time to time
+    def get_signals(self, prices: np.ndarray) -> Signals:
+        rng = np.random.default_rng(7)
+        n = len(prices)
+        return Signals(rng.random(n) < 0.05, rng.random(n) < 0.05, rng.random(n) < 0.03)
+
+
+class MovingAverageCross(SignalStrategy):
+    # reverse the position when the fast average crosses the slow one
+    def get_signals(self, prices: np.ndarray) -> Signals:
+        above = rolling_mean(prices[:, 4], 10) > rolling_mean(prices[:, 4], 50)
+        cross = np.concatenate(([False], above[1:] != above[:-1]))
+        return Signals(cross & above, cross & ~above, cross)
+
+
+class Pyramiding(SignalStrategy):
+    # add to both positions with various sizes, close them rarely
+    def get_signals(self, prices: np.ndarray) -> Signals:
+        n = len(prices)
+        sizes = np.where(np.arange(n) % 7 == 0, 50 + np.arange(n) % 13 * 10.0, 0.0)
+        return Signals(sizes, sizes[::-1].copy(), np.arange(n) % 97 == 0)
+
+
+class EntriesAtTheEnd(SignalStrategy):
+    # no exit, every entry of the last candles is filled or cancelled by cleanup()
+    def get_signals(self, prices: np.ndarray) -> Signals:
+        entries = np.zeros(len(prices), dtype=bool)
+        entries[[0, -4, -3, -2, -1]] = True
+        return Signals(long_entries=entries, short_entries=entries)
+
+
+def run_event_loop(strategy: SignalStrategy) -> dict:
+    # Strategy.run() recording the account after each candle
+    long, short = strategy.position_manager.get_positions()
+    balance = strategy.position_manager.balance
+    columns = {key: [] for key in ["longQuantity", "shortQuantity", "balances", "margin"]}
+    columns.update(longAveragePrice=[], shortAveragePrice=[])
+    while strategy.data.step():
+        strategy.update() if strategy.data.has_next() else strategy.cleanup()
+        strategy.record_equity()
+        values = [long.quantity, short.quantity, balance.current, balance.margin]
+        values += [long.average_price, short.average_price]
+        for column, value in zip(columns.values(), values, strict=True):
+            column.append(value)
+    return columns
+
+
+@pytest.mark.parametrize(
+    "strategy", [RandomSignals, MovingAverageCross, Pyramiding, EntriesAtTheEnd]
+)
+def test_vectorized_matches_event_loop(strategy):
+    prices = generate_prices(5000)
+    price_store.register("TEST", "1m", prices)
+    try:
+        event_driven = strategy.from_cfg(create_args(strategy.__name__, recordEquity=True))
+        vectorized = strategy.from_cfg(
+            create_args(strategy.__name__, recordEquity=True, vectorized=True)
+        )
+    finally:
+        price_store.detach("TEST", "1m")
+
+    columns = run_event_loop(event_driven)
+    vectorized.run()
+    result = vectorized.result
+
+    expected = event_driven.get_result()
+    assert vectorized.get_result() == pytest.approx(expected, abs=1e-6)
+    assert expected["fills"] > 0
+    assert np.allclose(result["equity"], event_driven.equity)
+    assert vectorized.equity == pytest.approx(event_driven.equity)
+    for column, values in columns.items():
+        assert np.allclose(result[column], values), column
+
+    fills = result["filledOrders"]
+    assert [
+        (o.filled_at, o.side, o.position_side, o.price)
+        for o in event_driven.order_manager.filled_orders
+    ] == list(
+        zip(fills["filledAt"], fills["side"], fills["positionSide"], fills["price"], strict=True)
+    )
+    assert np.allclose(
+        fills["quantity"], [o.quantity for o in event_driven.order_manager.filled_orders]
+    )
+
+
+def test_balance_must_pay_for_long_orders():
+    prices = generate_prices(10)
+    signals = Signals(long_entries=np.full(10, 6000.0))
+    with pytest.raises(ValueError):
+        run_signals(prices, signals, initial_balance=10000.0)
+    # shorts don't spend the balance
+    result = run_signals(prices, Signals(short_entries=np.full(10, 6000.0)), 10000.0)
+    assert result["shortQuantity"].max() > 0
+
+
+def test_empty_date_range():
+    prices = generate_prices(100)
+    price_store.register("TEST", "1m", prices)
+    try:
+        # starts after the last candle
+        config = create_args("RandomSignals", startTime="2024-02-01", vectorized=True)
+        strategy = RandomSignals.from_cfg(config)
+        event_driven = RandomSignals.from_cfg({**config, "vectorized": False})
+    finally:
+        price_store.detach("TEST", "1m")
+    strategy.run()
+    event_driven.run()
+    assert strategy.get_result() == event_driven.get_result()
+    assert strategy.get_result() == {"pnl": 0.0, "balance": 10000.0, "fills": 0, "candles": 0}
+    result = run_signals(np.zeros((0, 6)), Signals(), 10000.0)
+    assert len(result["equity"]) == len(result["filledOrders"]["price"]) == 0
@@ -0,0 +1,60 @@
+import pytest
+
+from backtest_env.sweep import run_sweep
+from backtest_env.utils import convert_datetime_to_nanosecond, filter_price_data
+from backtest_env.walk_forward import run_walk_forward, split_windows, stitch_equity
+from scripts.bench_utils import generate_prices
+from utils import create_args, write_csv
+
+
+def test_stitch_equity():
+    curves = [[100.0, 110.0], [], [100.0, 95.0, 105.0]]
+    assert stitch_equity(curves, 100.0).tolist() == [100.0, 110.0, 110.0, 105.0, 115.0]
+
+
+def test_walk_forward(tmp_path):
+    # 2 weeks of candles
+    write_csv(str(tmp_path / "TEST_1m.csv"), generate_prices(20_000))
+    config = create_args("TrendFollower")
+    space = {"Order Size": [50, 100], "Interval": [4, 8]}
+    result = run_walk_forward(
+        config, space, train_days=4, test_days=3, max_workers=2, data_dir=str(tmp_path)
+    )
+
+    windows = result["windows"]
+    assert len(windows) == 4
+    # the params of a window are the best ones of its in-sample part
+    train_config = {
+        **config,
+        "startTime": windows[0]["trainStart"],
+        "endTime": windows[0]["trainEnd"],
+    }
+    best = run_sweep(train_config, space, max_workers=2, data_dir=str(tmp_path))[0]
+    assert windows[0]["params"] == {"orderSize": best["orderSize"], "interval": best["interval"]}
+    assert windows[0]["train"]["pnl"] == best["pnl"]
+    # the stitched curve adds up the out-of-sample pnl of all windows
+    test_pnl = sum(window["test"]["pnl"] for window in windows)
+    assert result["pnl"] == pytest.approx(test_pnl, abs=1e-3)
+    assert result["equity"][0] == config["initialBalance"]
+    assert 0 <= result["maxDrawdown"] < 1
+
+
+def test_windows_do_not_overlap(tmp_path):
+    prices = generate_prices(20_000)
+    write_csv(str(tmp_path / "TEST_1m.csv"), prices)
+    windows = split_windows(create_args(), 4, 3, 3, str(tmp_path))
+
+    def open_times(start: str, end: str) -> list[float]:
+        start, end = convert_datetime_to_nanosecond(start), convert_datetime_to_nanosecond(end)
+        return filter_price_data(prices, start, end)[:, 0].tolist()
+
+    tests = [open_times(window["testStart"], window["testEnd"]) for window in windows]
+    for window, test in zip(windows, tests, strict=True):
+        train = open_times(window["trainStart"], window["trainEnd"])
+        # the test part starts with the candle after the last one of the train part
+        assert train[-1] + 60_000 == test[0]
+    # test parts follow each other without sharing a candle, up to the last candle
+    stitched = sum(tests, [])
+    assert stitched == sorted(set(stitched))
+    assert all(b - a == 60_000 for a, b in zip(stitched[:-1], stitched[1:], strict=True))
+    assert stitched[-1] == prices[-1, 0]
@@ -0,0 +1,94 @@
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from backtest_env.base.side import OrderSide, PositionSide
+from backtest_env.emitter import FrameEmitter
+from backtest_env.orders.limit import LimitOrder
+from backtest_env.orders.trailing_stop import TrailingStop
+from backtest_env.price import Price
+from backtest_env.wire import (
+    RAW_FLOAT,
+    decode_candles,
+    decode_decimals,
+    decode_ints,
+    decode_orders,
+    encode_candles,
+    encode_decimals,
+    encode_ints,
+    encode_orders,
+)
+from scripts.bench_utils import generate_prices
+from utils import create_long_order
+
+
+def test_ints_round_trip():
+    for values in [[5], [0, 1, -1, 200, 70_000], [0, 2**40, -(2**40)]]:
+        encoded = encode_ints(np.array(values))
+        decoded, offset = decode_ints(encoded, 0, len(values))
+        assert decoded.tolist() == values
+        assert offset == len(encoded)
+
+
+def test_decimals_round_trip():
+    for values in [[1.0, 2.0], [100.1234, 100.1236], [0.00001234, 0.00001235], [1 / 3, 2 / 3]]:
+        encoded = encode_decimals(np.array(values))
+        decoded, offset = decode_decimals(encoded, 0, len(values))
+        assert decoded.tolist() == values
+        assert offset == len(encoded)
+
+
+def test_decimals_out_of_int64_range():
+    # 3 decimals are enough, but 9.5e18 * 1000 doesn't fit in int64
+    for values in [[10_000_000_000.123, 9.5e18], [float("inf"), 1.0]]:
+        encoded = encode_decimals(np.array(values))
+        assert encoded[0] == RAW_FLOAT
+        decoded, _ = decode_decimals(encoded, 0, len(values))
+        assert decoded.tolist() == values
+
+
+def test_invalid_header():
+    with pytest.raises(ValueError):
+        decode_candles(b"XX" + encode_candles([])[2:])
+    with pytest.raises(ValueError):
+        decode_orders(encode_candles([]))
+
+
+def test_candles_round_trip():
+    candles = [Price(*row).json() for row in generate_prices(100)]
+    assert decode_candles(encode_candles(candles)) == candles
+    assert decode_candles(encode_candles([])) == []
+
+
+def test_orders_round_trip():
+    orders = [
+        create_long_order(price=100.5),
+        LimitOrder(OrderSide.SELL, 100.0, "Y", 123.4567, PositionSide.LONG, 1_000_000),
+    ]
+    orders[0].filled_at = 2_000_000
+    payload = [order.json() for order in orders]
+    assert decode_orders(encode_orders(payload)) == payload
+
+
+def test_orders_without_type():
+    # TrailingStop doesn't set a type, its type is ""
+    orders = [TrailingStop(OrderSide.BUY, 100.0, "X", 99.5), create_long_order()]
+    payload = [order.json() for order in orders]
+    assert payload[0]["type"] == ""
+    assert decode_orders(encode_orders(payload)) == payload
+
+
+def test_emitter_sends_binary_frames():
+    sio = Mock()
+    emitter = FrameEmitter(sio, max_fps=1, binary=True)
+    candles = [Price(*row).json() for row in generate_prices(3)]
+    for candle in candles:
+        emitter.emit("new_candle", candle)
+    emitter.emit("pnl", 1.0)
+    emitter.close()
+
+    frames = [call.args[1] for call in sio.emit.call_args_list if call.args[0] == "frame"]
+    received = sum((decode_candles(frame["new_candle"]) for frame in frames), [])
+    assert received == candles
+    assert frames[-1]["pnl"] == 1.0
@@ -0,0 +1,90 @@
+import os
+import time
+from multiprocessing.connection import wait
+
+import pytest
+
+from backtest_env.worker_pool import WorkerPool
+
+
+def wait_for(condition: callable, pool: WorkerPool, timeout: float = 60.0):
+    # wake up when a worker reports a job or exits instead of sleeping, a loaded machine only
+    # makes it slower. The timeout is a safety net for a hung worker
+    while not condition():
+        events = [worker.conn for worker in pool.workers]
+        events += [worker.process.sentinel for worker in pool.workers]
+        assert wait(events, timeout), "timed out"
+        pool.poll()
+
+
+class TestWorkerPool:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.finished = []
+        # time.sleep is a picklable job: its argument is the job duration
+        self.pool = WorkerPool(
+            size=2, max_jobs_per_worker=2, target=time.sleep, on_finished=self.finished.append
+        )
+        self.pool.start()
+        yield
+        self.pool.close()
+
+    def test_jobs_are_queued_until_a_worker_is_idle(self):
+        for i in range(5):
+            self.pool.submit(f"job-{i}", 0.01)
+        assert len(self.pool.queue) == 3
+
+        wait_for(lambda: len(self.finished) == 5, self.pool)
+        assert sorted(self.finished) == [f"job-{i}" for i in range(5)]
+
+    def test_workers_are_recycled_after_max_jobs(self):
+        old_workers = list(self.pool.workers)
+        for i in range(4):
+            self.pool.submit(f"job-{i}", 0)
+        wait_for(lambda: len(self.finished) == 4, self.pool)
+        # job-2 goes to the first worker done with its job, so at least one of them ran 2 jobs.
+        # It exits and the next poll replaces it
+        recycled = [worker for worker in old_workers if worker.jobs == 2]
+        assert recycled
+        for worker in recycled:
+            worker.process.join()
+        self.pool.poll()
+        pids = {worker.process.pid for worker in self.pool.workers}
+        assert all(worker.process.pid not in pids for worker in recycled)
+        assert len(self.pool.workers) == 2
+
+    def test_jobs_wait_for_the_replacement_of_a_recycled_worker(self, tmp_path):
+        # the worker exits after each job, a job submitted as soon as the previous one finished
+        # (before the worker exited) must not be sent to it and lost
+        def on_finished(job_id: str):
+            self.finished.append(job_id)
+            if len(self.finished) < 3:
+                pool.submit(f"job-{len(self.finished)}", str(tmp_path / str(len(self.finished))))
+
+        # os.mkdir is a picklable job that leaves a trace
+        pool = WorkerPool(size=1, max_jobs_per_worker=1, target=os.mkdir, on_finished=on_finished)
+        pool.start()
+        try:
+            pool.submit("job-0", str(tmp_path / "0"))
+            deadline = time.monotonic() + 10
+            while len(self.finished) < 3 and time.monotonic() < deadline:
+                # poll as soon as the job is done, while its worker is still exiting
+                pool.workers[0].conn.poll(1)
+                pool.poll()
+        finally:
+            pool.close()
+        assert self.finished == ["job-0", "job-1", "job-2"]
+        assert sorted(os.listdir(tmp_path)) == ["0", "1", "2"]
+
+    def test_cancel_running_and_queued_jobs(self):
+        for i in range(3):
+            self.pool.submit(f"job-{i}", 60)
+        assert self.pool.is_running("job-0")
+
+        assert self.pool.cancel("job-2")
+        assert len(self.pool.queue) == 0
+        assert self.pool.cancel("job-0")
+        # the killed worker is replaced and can take new jobs
+        self.pool.submit("job-3", 0)
+        wait_for(lambda: self.finished == ["job-3"], self.pool)
+        assert not self.pool.cancel("job-0")
@@ -1,5 +1,13 @@
+import random
+from unittest.mock import Mock
+
 from backtest_env.base.side import OrderSide, PositionSide
+from backtest_env.order_manager import OrderManager
+from backtest_env.orders.limit import LimitOrder
 from backtest_env.orders.market import MarketOrder
+from backtest_env.orders.oco import OneCancelOtherOrder
+from backtest_env.orders.stop import StopOrder
+from backtest_env.price import Price
 
 
 def create_long_order(
@@ -18,3 +26,61 @@ def create_short_order(
     price: float = 100.0,
 ):
     return MarketOrder(side, quantity * price, symbol, price, PositionSide.SHORT)
+
+
+def create_args(strategy: str = "Baseline", symbol: str = "TEST", **kwargs) -> dict:
+    return {
+        "initialBalance": 10000.0,
+        "symbol": symbol,
+        "timeframe": "1m",
+        "startTime": "2024-01-01",
+        "endTime": None,
+        "strategy": strategy,
+        "allowLiveUpdates": False,
+        "gridSize": 5,
+        "orderSize": 100.0,
+        "interval": 4,
+        "candleCacheSize": 2,
+        **kwargs,
+    }
+
+
+def write_csv(file_name: str, rows: list[list[float]]):
+    with open(file_name, "w") as f:
+        f.write("open_time,open,high,low,close,close_time\n")
+        f.writelines(",".join(str(v) for v in row) + "\n" for row in rows)
+
+
+class LegacyOrderManager(OrderManager):
+    def process_orders(self):
+        for order in list(self.orders.values()):
+            order.update(self.price_dataset.get_current_price())
+
+
+def simulate(manager_cls: type[OrderManager], seed: int, **kwargs) -> list[tuple]:
+    rng = random.Random(seed)
+    dataset = Mock()
+    order_mgr = manager_cls(Mock(), dataset, **kwargs)
+    for _ in range(200):
+        price = round(rng.uniform(90, 110), 2)
+        side = rng.choice([OrderSide.BUY, OrderSide.SELL])
+        kind = rng.randrange(3)
+        if kind == 0:
+            order = LimitOrder(side, 100.0, "X", price)
+        elif kind == 1:
+            order = StopOrder(side, 100.0, "X", price)
+        else:
+            order = OneCancelOtherOrder(
+                price - 1, price + 1, side, 100.0, "X", price, side.to_position()
+            )
+        order_mgr.add_order(order)
+
+    for i in range(100):
+        low = rng.uniform(90, 110)
+        dataset.get_current_price.return_value = Price(i, low, low + 1, low, low, i)
+        order_mgr.process_orders()
+        if i % 10 == 0:
+            order_mgr.add_order(create_long_order(price=low))
+
+    order_mgr.unsubscribe()
+    return [(o.type, o.side, o.price, o.filled_at) for o in order_mgr.get_order_history()]